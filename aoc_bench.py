@@ -0,0 +1,129 @@
+import argparse
+import importlib
+import json
+import os
+import sys
+from statistics import median
+from aoc_common import DATA_DIR, read_file, time_call
+from aoc_run import DAY_PHASES, parse_days, solved_parts
+
+
+BASELINE_FILE = os.path.join(DATA_DIR, 'bench_baseline.json')
+
+
+def bench_call(func, *args, warmup: int = 1, repeat: int = 5) -> dict:
+    """Times func(*args) after a number of untimed warmup calls.
+
+    Args:
+        func (callable): Function to benchmark.
+        *args: Arguments to func.
+        warmup (int): Number of untimed calls before measuring.
+        repeat (int): Number of timed calls.
+
+    Returns:
+        dict: Median, minimum and maximum time per call in seconds.
+    """
+    for _ in range(warmup):
+        func(*args)
+    times = [time_call(func, *args)[1] for _ in range(repeat)]
+
+    return {'median': median(times), 'min': min(times), 'max': max(times)}
+
+
+def bench_day(day_number: int, warmup: int = 1, repeat: int = 5) -> dict:
+    """Benchmarks the parser and both solutions of a day on its input.
+
+    Args:
+        day_number (int): Day to benchmark.
+        warmup (int): Number of untimed calls before measuring each phase.
+        repeat (int): Number of timed calls for each phase.
+
+    Returns:
+        dict: Timings keyed by "day{day_number}.{phase}".
+    """
+    day = importlib.import_module(f'day{day_number}')
+    phases = DAY_PHASES[day_number]
+    data = read_file(day_number)
+
+    results = {f'day{day_number}.parse': bench_call(phases['parse'], day, data,
+                                                    warmup=warmup, repeat=repeat)}
+    parsed = phases['parse'](day, data)
+    for part in solved_parts(day_number):
+        results[f'day{day_number}.{part}'] = bench_call(phases[part], day, parsed,
+                                                        warmup=warmup, repeat=repeat)
+
+    return results
+
+
+def find_regressions(results: dict, baseline: dict, threshold: float) -> list:
+    """Compares median times to a baseline.
+
+    Args:
+        results (dict): Timings from bench_day.
+        baseline (dict): Stored timings to compare with.
+        threshold (float): Allowed relative slowdown, 0.25 allows 25 % slower.
+
+    Returns:
+        list: (name, baseline median, current median) for every slower benchmark.
+    """
+    regressions = []
+    for name, timing in results.items():
+        if name not in baseline:
+            continue
+        before = baseline[name]['median']
+        if timing['median'] > before * (1+threshold):
+            regressions.append((name, before, timing['median']))
+
+    return regressions
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Benchmark parsers and solutions and compare against a stored baseline.')
+    parser.add_argument('days', nargs='?', default='1-10',
+                        help='Days to benchmark, e.g. "1-10" or "1,3,5-7" (default: all).')
+    parser.add_argument('--warmup', type=int, default=1, help='Untimed calls per phase.')
+    parser.add_argument('-n', '--repeat', type=int, default=5, help='Timed calls per phase.')
+    parser.add_argument('-o', '--output', help='Write the results as JSON to this file.')
+    parser.add_argument('--baseline', default=BASELINE_FILE,
+                        help=f'Baseline file to compare with (default: {BASELINE_FILE}).')
+    parser.add_argument('--save-baseline', action='store_true',
+                        help='Store the results as the new baseline instead of comparing.')
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help='Allowed relative slowdown before failing (default: 0.25).')
+    args = parser.parse_args()
+
+    results = {}
+    for day_number in parse_days(args.days):
+        results.update(bench_day(day_number, args.warmup, args.repeat))
+
+    for name, timing in results.items():
+        print(f'{name:<14} {timing["median"]*1000:>12.3f} ms '
+              f'(min {timing["min"]*1000:.3f}, max {timing["max"]*1000:.3f})')
+
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(results, file, indent=2)
+
+    if args.save_baseline:
+        baseline = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as file:
+                baseline = json.load(file)
+        # Keep the baseline for days that were not run this time
+        baseline.update(results)
+        with open(args.baseline, 'w') as file:
+            json.dump(baseline, file, indent=2)
+        print(f'Baseline saved to {args.baseline}')
+    elif os.path.exists(args.baseline):
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+        regressions = find_regressions(results, baseline, args.threshold)
+        for name, before, after in regressions:
+            print(f'REGRESSION {name}: {before*1000:.3f} ms -> {after*1000:.3f} ms '
+                  f'({after/before-1:+.0%})')
+        if regressions:
+            sys.exit(1)
+        print(f'No regressions against {args.baseline}')
+    else:
+        print(f'No baseline at {args.baseline}, run with --save-baseline to create one')
@@ -1,11 +1,180 @@
+import hashlib
+import mmap
+import os
+import pickle
+import re
 from time import perf_counter
+import numpy as np
+
+
+# Directory with the puzzle inputs, can be pointed to e.g. generated inputs
+DATA_DIR = os.environ.get('AOC_DATA_DIR', 'data')
+CACHE_DIR = os.path.join(DATA_DIR, 'cache')
+
+# Patterns for extract_ints by (input type, signed)
+INT_PATTERNS = {(str, False): re.compile(r'\d+'),
+                (str, True): re.compile(r'-?\d+'),
+                (bytes, False): re.compile(rb'\d+'),
+                (bytes, True): re.compile(rb'-?\d+')}
+# Bytes parsed at a time by extract_ints with as_array
+INT_BLOCK_BYTES = 1 << 22
+
+
+def input_file_name(day_number: int):
+    '''Returns the path to the puzzle input for a given day.'''
+    return os.path.join(DATA_DIR, f'day{day_number}_input.txt')
+
 
 def read_file(day_number: int):
     '''Read data from file for a given day, with the day number given as an int.
     Returns a list of lines, with each line stripped from white-spaces.'''
+    return read_lines(input_file_name(day_number))
+
+
+def read_lines(file_name: str):
+    '''Read data from any file given by its path.
+    Returns a list of lines, with each line stripped from white-spaces.'''
     file_data = []
-    file_name = f'data/day{day_number}_input.txt'
     with open(file_name, 'r') as file:
         for line in file:
             file_data.append(line.strip())
-    return file_data
\ No newline at end of file
+    return file_data
+
+
+def stream_file(day_number: int, as_bytes: bool = False):
+    '''Streaming counterpart to read_file. Memory-maps the input for a given day
+    and yields one line at a time, stripped from white-spaces, so the whole
+    file is never held as a list of str.
+    Yields bytes instead of str when as_bytes is True, skipping the decoding.'''
+    file_name = input_file_name(day_number)
+    with open(file_name, 'rb') as file:
+        # mmap can not map an empty file
+        if os.fstat(file.fileno()).st_size == 0:
+            return
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            for line in iter(buffer.readline, b''):
+                line = line.strip()
+                yield line if as_bytes else line.decode()
+
+
+def read_array(day_number: int):
+    '''Memory-maps the input for a given day as a read-only NumPy uint8 array
+    of the raw bytes, for solutions that work on the whole file at once.'''
+    file_name = input_file_name(day_number)
+    # np.memmap can not map an empty file
+    if os.path.getsize(file_name) == 0:
+        return np.zeros(0, dtype=np.uint8)
+    return np.memmap(file_name, dtype=np.uint8, mode='r')
+
+
+def extract_ints(text, signed: bool = False, as_array: bool = False):
+    '''Extracts all integers from a str or bytes in a single pass, which can be
+    a line or a whole file buffer. A "-" directly before a number is only read
+    as a sign when signed is True, so e.g. "seed-to-soil" never gives negatives.
+    Returns a list of int, or a NumPy int64 array when as_array is True.
+    Buffers are then parsed with array operations in blocks of INT_BLOCK_BYTES,
+    so no Python object is made per integer.'''
+    if as_array:
+        if isinstance(text, str):
+            pattern = INT_PATTERNS[(str, signed)]
+            return np.fromiter((int(match.group()) for match in pattern.finditer(text)), dtype=np.int64)
+        return _extract_ints_array(text, signed)
+    # Anything that is not a str is a bytes-like buffer, such as an mmap
+    pattern = INT_PATTERNS[(str if isinstance(text, str) else bytes, signed)]
+    return list(map(int, pattern.findall(text)))
+
+
+def _extract_ints_array(buffer, signed: bool):
+    '''Array version of extract_ints for a bytes-like buffer. Blocks are split
+    at non-digits so that no number is cut in two.'''
+    if not isinstance(buffer, np.ndarray):
+        buffer = np.frombuffer(buffer, dtype=np.uint8)
+    blocks = []
+    start = 0
+    while start < len(buffer):
+        stop = min(start + INT_BLOCK_BYTES, len(buffer))
+        while stop < len(buffer) and ord('0') <= buffer[stop] <= ord('9'):
+            stop += 1
+        blocks.append(_block_ints(buffer[start:stop], signed))
+        start = stop
+    if not blocks:
+        return np.zeros(0, dtype=np.int64)
+    return np.concatenate(blocks)
+
+
+def _block_ints(block, signed: bool):
+    '''Reads the digit runs of a uint8 array as int64, one digit position at a time.'''
+    # Bytes below '0' wrap around to large values
+    digits = block - np.uint8(ord('0'))
+    is_digit = digits < 10
+    run_start = is_digit.copy()
+    run_start[1:] &= ~is_digit[:-1]
+    run_stop = is_digit.copy()
+    run_stop[:-1] &= ~is_digit[1:]
+    starts = np.flatnonzero(run_start)
+    lengths = np.flatnonzero(run_stop) + 1 - starts
+    del is_digit, run_start, run_stop
+
+    values = np.zeros(len(starts), dtype=np.int64)
+    max_value = np.iinfo(np.int64).max
+    for position in range(int(lengths.max()) if len(lengths) else 0):
+        active = lengths > position
+        current = values[active]
+        digit = digits[starts[active] + position].astype(np.int64)
+        if np.any(current > (max_value - digit) // 10):
+            raise OverflowError('extract_ints found a number that does not fit in int64')
+        values[active] = current*10 + digit
+    if signed:
+        negative = (starts > 0) & (block[np.maximum(starts-1, 0)] == ord('-'))
+        values[negative] *= -1
+    return values
+
+
+def file_digest(file_name: str):
+    '''Returns a hex digest of the content of a file, read in chunks.'''
+    digest = hashlib.blake2b()
+    with open(file_name, 'rb') as file:
+        for chunk in iter(lambda: file.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def cached_parse(day_number: int, parse, version='', name: str = None):
+    '''Returns parse(read_file(day_number)), using an on-disk pickle of the parsed
+    data when possible so that repeated runs skip reading and parsing.
+    The cache is stored in CACHE_DIR as day{day_number}_{name}.pickle and is
+    replaced whenever the content of the input file or the parser version changes.
+    name defaults to the name of the parse function.'''
+    name = name or parse.__name__
+    cache_file = os.path.join(CACHE_DIR, f'day{day_number}_{name}.pickle')
+    key = (file_digest(input_file_name(day_number)), version)
+
+    if os.path.exists(cache_file):
+        try:
+            with open(cache_file, 'rb') as file:
+                # Key is stored first so a stale payload is never unpickled
+                if pickle.load(file) == key:
+                    return pickle.load(file)
+        except Exception:
+            # Unreadable or truncated cache, parse again and overwrite it
+            pass
+
+    parsed = parse(read_file(day_number))
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    # Write to a temporary file first so no partial cache is ever read
+    temp_file = f'{cache_file}.{os.getpid()}.tmp'
+    with open(temp_file, 'wb') as file:
+        pickle.dump(key, file, protocol=pickle.HIGHEST_PROTOCOL)
+        pickle.dump(parsed, file, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(temp_file, cache_file)
+    return parsed
+
+
+def time_call(func, *args, repeat: int = 1):
+    '''Calls func(*args) repeat times and measures the wall time with perf_counter.
+    Returns the result of the last call and the mean time per call in seconds.'''
+    start = perf_counter()
+    for _ in range(repeat):
+        result = func(*args)
+    elapsed = perf_counter() - start
+    return result, elapsed / repeat
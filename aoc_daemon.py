@@ -0,0 +1,178 @@
+import argparse
+import importlib
+import json
+import os
+import random
+import socket
+import socketserver
+import sys
+import tempfile
+import threading
+
+
+DEFAULT_SOCKET = os.environ.get('AOC_SOCKET',
+                                os.path.join(tempfile.gettempdir(), 'aoc_daemon.sock'))
+# Size of the generated inputs solved at startup, enough for every generator
+WARM_UP_SIZE = 12
+# Inputs for days without a generator
+WARM_UP_INPUTS = {6: ['Time:      7  15   30', 'Distance:  9  40  200']}
+
+
+def solve_request(request: dict) -> dict:
+    """Solves one request received by the daemon.
+
+    Args:
+        request (dict): {"day": int, "input": path to the input file,
+            "parts": optional list of "part1"/"part2" (default: all solved parts)}.
+
+    Returns:
+        dict: The day, input and answer for each part together with the time
+        spent solving, or {"error": message} if the request failed.
+    """
+    from aoc_common import read_lines, time_call
+    from aoc_run import DAY_PHASES, solved_parts
+
+    try:
+        day_number = int(request['day'])
+        day = importlib.import_module(f'day{day_number}')
+        parts = request.get('parts') or solved_parts(day_number)
+
+        def solve():
+            parsed = DAY_PHASES[day_number]['parse'](day, read_lines(request['input']))
+            return {part: DAY_PHASES[day_number][part](day, parsed) for part in parts}
+
+        answers, seconds = time_call(solve)
+    except Exception as error:
+        return {'error': f'{type(error).__name__}: {error}'}
+
+    return {'day': day_number, 'input': request['input'], **answers, 'seconds': seconds}
+
+
+class SolveHandler(socketserver.StreamRequestHandler):
+    """Answers newline separated JSON requests on a connection with one JSON
+    line each, until the client closes it. {"command": "shutdown"} stops the daemon.
+    """
+
+    def handle(self):
+        for line in self.rfile:
+            try:
+                request = json.loads(line)
+                if not isinstance(request, dict):
+                    raise ValueError(f'request must be a JSON object, got {type(request).__name__}')
+            except ValueError as error:
+                # Answer bad requests instead of dropping the connection
+                response = {'error': f'{type(error).__name__}: {error}'}
+            else:
+                if request.get('command') == 'shutdown':
+                    # shutdown() blocks until serve_forever returns, so it can
+                    # not be called from the thread handling the request
+                    threading.Thread(target=self.server.shutdown).start()
+                    response = {'status': 'shutting down'}
+                else:
+                    response = solve_request(request)
+            self.wfile.write(json.dumps(response).encode() + b'\n')
+            self.wfile.flush()
+
+
+def warm_up(day_number: int):
+    """Parses and solves a tiny input for a day, so that its regex patterns are
+    compiled and cached before the first request for the day.
+
+    Args:
+        day_number (int): Day to warm up.
+    """
+    from aoc_generate import GENERATORS
+    from aoc_run import DAY_PHASES, solved_parts
+
+    day = importlib.import_module(f'day{day_number}')
+    if day_number in GENERATORS:
+        data = list(GENERATORS[day_number](WARM_UP_SIZE, random.Random(0)))
+    else:
+        data = WARM_UP_INPUTS[day_number]
+    parsed = DAY_PHASES[day_number]['parse'](day, data)
+    for part in solved_parts(day_number):
+        DAY_PHASES[day_number][part](day, parsed)
+
+
+def serve(socket_path: str = DEFAULT_SOCKET):
+    """Imports all day modules once and solves a tiny input for each, then
+    answers solve requests on a Unix socket until shut down, so requests skip
+    interpreter startup, imports and compiling regex patterns.
+
+    Args:
+        socket_path (str): Path of the Unix socket to listen on.
+    """
+    # Only the daemon needs the solvers, the client stays light to start
+    from aoc_run import DAY_PHASES
+
+    if os.path.exists(socket_path):
+        try:
+            with socket.socket(socket.AF_UNIX) as probe:
+                probe.connect(socket_path)
+            sys.exit(f'A daemon is already listening on {socket_path}')
+        except ConnectionRefusedError:
+            # Left behind by a daemon that did not exit cleanly
+            os.unlink(socket_path)
+
+    for day_number in DAY_PHASES:
+        try:
+            warm_up(day_number)
+        except Exception as error:
+            # A day that fails to warm up can still answer requests
+            print(f'Could not warm up day {day_number}: {type(error).__name__}: {error}')
+
+    with socketserver.ThreadingUnixStreamServer(socket_path, SolveHandler) as server:
+        print(f'Listening on {socket_path}')
+        try:
+            server.serve_forever()
+        finally:
+            os.unlink(socket_path)
+
+
+def send_requests(requests: list, socket_path: str = DEFAULT_SOCKET):
+    """Sends requests to a running daemon over one connection.
+
+    Args:
+        requests (list): Request dicts, see solve_request.
+        socket_path (str): Path of the daemon's Unix socket.
+
+    Yields:
+        dict: Response to each request, in order.
+    """
+    with socket.socket(socket.AF_UNIX) as client:
+        client.connect(socket_path)
+        with client.makefile('rwb') as stream:
+            for request in requests:
+                stream.write(json.dumps(request).encode() + b'\n')
+                stream.flush()
+                yield json.loads(stream.readline())
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Resident solver daemon and its client.')
+    parser.add_argument('--socket', default=DEFAULT_SOCKET,
+                        help=f'Unix socket path (default: {DEFAULT_SOCKET}, or set AOC_SOCKET).')
+    commands = parser.add_subparsers(dest='command', required=True)
+    commands.add_parser('serve', help='Start the daemon.')
+    commands.add_parser('stop', help='Stop a running daemon.')
+    solve_parser = commands.add_parser(
+        'solve', help='Solve input files with a running daemon, printing one JSON line per file.')
+    solve_parser.add_argument('day', type=int, help='Day of the input files.')
+    solve_parser.add_argument('inputs', nargs='+', help='Input files.')
+    solve_parser.add_argument('--part', type=int, choices=(1, 2),
+                              help='Only solve this part.')
+    args = parser.parse_args()
+
+    if args.command == 'serve':
+        serve(args.socket)
+    elif args.command == 'stop':
+        for response in send_requests([{'command': 'shutdown'}], args.socket):
+            print(json.dumps(response))
+    else:
+        parts = [f'part{args.part}'] if args.part else None
+        # Paths are sent as absolute since the daemon may run in another directory
+        requests = [{'day': args.day, 'input': os.path.abspath(file_name), 'parts': parts}
+                    for file_name in args.inputs]
+        for response in send_requests(requests, args.socket):
+            print(json.dumps(response))
@@ -0,0 +1,288 @@
+import argparse
+import os
+import random
+from itertools import product
+from aoc_run import parse_days
+
+
+DIGIT_WORDS = ['one', 'two', 'three', 'four', 'five', 'six', 'seven', 'eight', 'nine']
+ALMANAC_MAPS = ['seed-to-soil', 'soil-to-fertilizer', 'fertilizer-to-water',
+                'water-to-light', 'light-to-temperature',
+                'temperature-to-humidity', 'humidity-to-location']
+CARD_LABELS = 'AKQJT98765432'
+PIPE_WIDTH = 140
+
+
+def day1_lines(size: int, rng: random.Random):
+    """Calibration lines of letters, digits and spelled out digits.
+    Every line has at least one digit so that both parts are defined.
+
+    Args:
+        size (int): Number of lines.
+        rng (random.Random): Random number generator.
+
+    Yields:
+        str: Lines of the puzzle input.
+    """
+    for _ in range(size):
+        tokens = [rng.choice('abcdefghijklmnopqrstuvwxyz') for _ in range(rng.randint(2, 30))]
+        for _ in range(rng.randint(0, 3)):
+            tokens.insert(rng.randrange(len(tokens)+1), rng.choice(DIGIT_WORDS))
+        for _ in range(rng.randint(1, 3)):
+            tokens.insert(rng.randrange(len(tokens)+1), str(rng.randint(1, 9)))
+        yield ''.join(tokens)
+
+
+def day2_lines(size: int, rng: random.Random):
+    """Games of rounds with red, green and blue cubes.
+    Every colour is drawn at least once per game.
+
+    Args:
+        size (int): Number of games.
+        rng (random.Random): Random number generator.
+
+    Yields:
+        str: Lines of the puzzle input.
+    """
+    colours = ['red', 'green', 'blue']
+    for game_id in range(1, size+1):
+        rounds = [rng.sample(colours, rng.randint(1, 3)) for _ in range(rng.randint(1, 6))]
+        # Add any colour that was never drawn to the first round
+        rounds[0].extend(sorted(set(colours).difference(*rounds)))
+        text = '; '.join(', '.join(f'{rng.randint(1, 20)} {colour}' for colour in drawn)
+                         for drawn in rounds)
+        yield f'Game {game_id}: {text}'
+
+
+def day3_lines(size: int, rng: random.Random, width: int = 140):
+    """Engine schematic of numbers, symbols and '.'.
+
+    Args:
+        size (int): Number of rows.
+        rng (random.Random): Random number generator.
+        width (int): Number of columns.
+
+    Yields:
+        str: Lines of the puzzle input.
+    """
+    for _ in range(size):
+        row = []
+        while len(row) < width:
+            roll = rng.random()
+            if roll < 0.1:
+                # Numbers are separated from each other by at least one non-digit
+                row.append(str(rng.randint(1, 999)))
+                row.append(rng.choice('...*#+$'))
+            elif roll < 0.12:
+                row.append(rng.choice('*#+$/@=%&-'))
+            else:
+                row.append('.')
+        yield ''.join(row)[:width]
+
+
+def day4_lines(size: int, rng: random.Random):
+    """Scratchcards with 10 winning numbers and 25 numbers you have.
+
+    Args:
+        size (int): Number of cards.
+        rng (random.Random): Random number generator.
+
+    Yields:
+        str: Lines of the puzzle input.
+    """
+    for card_id in range(1, size+1):
+        winning = rng.sample(range(1, 100), 10)
+        # Numbers you have draw from the winning numbers to give 0-10 matches
+        matches = rng.sample(winning, rng.randint(0, 10))
+        others = rng.sample([num for num in range(1, 100) if num not in winning], 25-len(matches))
+        have = matches + others
+        rng.shuffle(have)
+        winning_text = ' '.join(f'{num:>2}' for num in winning)
+        have_text = ' '.join(f'{num:>2}' for num in have)
+        yield f'Card {card_id:>3}: {winning_text} | {have_text}'
+
+
+def day5_lines(size: int, rng: random.Random, map_entries: int = 30):
+    """Almanac with seeds and seven maps. Each map is a bijection of [0, 2^32)
+    made by splitting it into map_entries ranges and shuffling their order.
+
+    Args:
+        size (int): Number of seeds, rounded down to an even number so
+            that the seeds also form (start, length) pairs.
+        rng (random.Random): Random number generator.
+        map_entries (int): Number of ranges in each map.
+
+    Yields:
+        str: Lines of the puzzle input.
+    """
+    id_limit = 2**32
+    seeds = []
+    for _ in range(size//2):
+        seeds.append(rng.randrange(id_limit - 10**8))
+        seeds.append(rng.randint(1, 10**8))
+    yield 'seeds: ' + ' '.join(str(seed) for seed in seeds)
+
+    for map_name in ALMANAC_MAPS:
+        yield ''
+        yield f'{map_name} map:'
+        cuts = sorted(rng.sample(range(1, id_limit), map_entries-1))
+        ranges = list(zip([0] + cuts, cuts + [id_limit]))
+        destinations = ranges.copy()
+        rng.shuffle(destinations)
+        destination_start = 0
+        for source_start, source_stop in destinations:
+            yield f'{destination_start} {source_start} {source_stop-source_start}'
+            destination_start += source_stop-source_start
+
+
+def day7_lines(size: int, rng: random.Random):
+    """Camel Cards hands with bets.
+
+    Args:
+        size (int): Number of hands.
+        rng (random.Random): Random number generator.
+
+    Yields:
+        str: Lines of the puzzle input.
+    """
+    for _ in range(size):
+        hand = ''.join(rng.choices(CARD_LABELS, k=5))
+        yield f'{hand} {rng.randint(1, 1000)}'
+
+
+def day8_lines(size: int, rng: random.Random, ghosts: int = 6):
+    """Instructions and a node network of separate loops. Each loop has one
+    start node (ends with A) and one end node (ends with Z), the first loop
+    goes from AAA to ZZZ. Node names have three letters, which limits the
+    size of the network.
+
+    Args:
+        size (int): Number of nodes.
+        rng (random.Random): Random number generator.
+        ghosts (int): Number of loops (start nodes for part 2).
+
+    Yields:
+        str: Lines of the puzzle input.
+    """
+    # Names ending with A or Z are reserved for start and end nodes
+    max_nodes = 26*26*24 + 2*ghosts
+    if size > max_nodes:
+        raise ValueError(f'Day 8 is limited to {max_nodes} nodes, got {size}')
+    if size < 2*ghosts:
+        raise ValueError(f'Day 8 needs at least 2 nodes per loop, got {size}')
+
+    yield ''.join(rng.choices('LR', k=rng.randint(100, 300)))
+    yield ''
+
+    letters = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+    starts = ['AAA'] + rng.sample([f'{a}{b}A' for a, b in product(letters, repeat=2)
+                                    if a+b != 'AA'], ghosts-1)
+    ends = ['ZZZ'] + rng.sample([f'{a}{b}Z' for a, b in product(letters, repeat=2)
+                                  if a+b != 'ZZ'], ghosts-1)
+    middle = [''.join(name) for name in product(letters, letters, letters[1:-1])]
+    middle = rng.sample(middle, size-2*ghosts)
+
+    for ghost in range(ghosts):
+        loop = [starts[ghost]] + middle[ghost::ghosts] + [ends[ghost]]
+        for i, node in enumerate(loop):
+            # Both directions lead along the loop, back to the start after the end
+            destination = loop[(i+1) % len(loop)]
+            yield f'{node} = ({destination}, {destination})'
+
+
+def day9_lines(size: int, rng: random.Random, length: int = 21):
+    """Sequences sampled from integer polynomials of degree 0-5, so
+    repeated differences always reach a constant line.
+
+    Args:
+        size (int): Number of sequences.
+        rng (random.Random): Random number generator.
+        length (int): Number of values per sequence.
+
+    Yields:
+        str: Lines of the puzzle input.
+    """
+    for _ in range(size):
+        coefficients = [rng.randint(-9, 9) for _ in range(rng.randint(1, 6))]
+        values = [sum(c * x**power for power, c in enumerate(coefficients))
+                  for x in range(length)]
+        yield ' '.join(str(value) for value in values)
+
+
+def day10_lines(size: int, rng: random.Random, width: int = PIPE_WIDTH):
+    """Pipe maze where every tile is part of a single loop that snakes through
+    the rows and returns along the first column. The start tile is placed at a
+    random row of the first column.
+
+    Args:
+        size (int): Number of rows, rounded down to an even number (at least 4).
+        rng (random.Random): Random number generator.
+        width (int): Number of columns (at least 3).
+
+    Yields:
+        str: Lines of the puzzle input.
+    """
+    rows = max(4, size - size % 2)
+    width = max(3, width)
+    start_row = rng.randint(1, rows-2)
+    for row in range(rows):
+        if row == 0:
+            line = 'F' + '-'*(width-2) + '7'
+        elif row == rows-1:
+            line = 'L' + '-'*(width-2) + 'J'
+        elif row % 2 == 1:
+            line = '|' + 'F' + '-'*(width-3) + 'J'
+        else:
+            line = '|' + 'L' + '-'*(width-3) + '7'
+        if row == start_row:
+            line = 'S' + line[1:]
+        yield line
+
+
+GENERATORS = {1: day1_lines, 2: day2_lines, 3: day3_lines, 4: day4_lines, 5: day5_lines,
+              7: day7_lines, 8: day8_lines, 9: day9_lines, 10: day10_lines}
+
+
+def generate(day_number: int, size: int, seed: int = 0, data_dir: str = 'data/generated', **options):
+    """Writes a synthetic puzzle input for a day as data_dir/day{day_number}_input.txt.
+    Use with AOC_DATA_DIR=data_dir to run the solutions on it.
+
+    Args:
+        day_number (int): Day to generate the input for.
+        size (int): Number of lines/records (rows for grids, seeds for day 5, nodes for day 8).
+        seed (int): Seed for the random number generator.
+        data_dir (str): Directory to write the input to.
+        **options: Extra keyword arguments for the day's generator, e.g. width.
+
+    Returns:
+        str: Path to the written file.
+    """
+    rng = random.Random(seed)
+    os.makedirs(data_dir, exist_ok=True)
+    file_name = os.path.join(data_dir, f'day{day_number}_input.txt')
+    with open(file_name, 'w') as file:
+        file.writelines(f'{line}\n' for line in GENERATORS[day_number](size, rng, **options))
+
+    return file_name
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Generate synthetic puzzle inputs of a chosen size.')
+    parser.add_argument('days', help='Days to generate, e.g. "1-10" or "1,3,5-7". '
+                                     'Day 6 has no generator and is skipped.')
+    parser.add_argument('size', type=int,
+                        help='Number of lines/records (rows for grids, seeds for day 5, nodes for day 8).')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed (default: 0).')
+    parser.add_argument('--data-dir', default='data/generated',
+                        help='Output directory (default: data/generated).')
+    parser.add_argument('--width', type=int, help='Grid width for days 3 and 10.')
+    args = parser.parse_args()
+
+    for day_number in parse_days(args.days):
+        if day_number not in GENERATORS:
+            continue
+        options = {}
+        if args.width and day_number in (3, 10):
+            options['width'] = args.width
+        print(generate(day_number, args.size, args.seed, args.data_dir, **options))
@@ -0,0 +1,165 @@
+import cProfile
+import io
+import os
+import pstats
+import sys
+import threading
+import tracemalloc
+from collections import Counter
+
+
+class StackSampler:
+    """Samples the call stack of the thread that started it at a fixed interval
+    and counts how often each stack is seen, for flame graphs.
+
+    Args:
+        interval (float): Seconds between samples.
+        stop_code (code): Frames from this code object and further out
+            are left out of the stacks.
+    """
+
+    def __init__(self, interval: float = 0.001, stop_code=None):
+        self.interval = interval
+        self.stop_code = stop_code
+        self.counts = Counter()
+        self._thread_id = None
+        self._stop = None
+        self._thread = None
+
+    def start(self):
+        self._thread_id = threading.get_ident()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _sample(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self._thread_id)
+            stack = []
+            while frame is not None and frame.f_code is not self.stop_code:
+                stack.append(f'{frame.f_globals.get("__name__")}.{frame.f_code.co_name}')
+                frame = frame.f_back
+            if stack:
+                self.counts[';'.join(reversed(stack))] += 1
+
+    def write_folded(self, file_name: str):
+        """Writes the sampled stacks in the collapsed "a;b;c count" format read by
+        flamegraph.pl, speedscope and similar tools.
+
+        Args:
+            file_name (str): File to write to.
+        """
+        with open(file_name, 'w') as file:
+            for stack, count in sorted(self.counts.items()):
+                file.write(f'{stack} {count}\n')
+
+
+def profiled(func, name: str, profile_dir: str = None, flamegraph_dir: str = None):
+    """Wraps a function so that every call is profiled with cProfile and/or
+    sampled for flame graphs. The files are rewritten after every call and
+    hold the totals over all calls to the wrapper:
+    {name}.prof (pstats), {name}.txt (call counts and cumulative times) and
+    {name}.folded (sampled stacks).
+
+    Args:
+        func (callable): Function to profile.
+        name (str): Base name of the output files.
+        profile_dir (str): Directory for cProfile output, or None to skip cProfile.
+        flamegraph_dir (str): Directory for sampled stacks, or None to skip sampling.
+
+    Returns:
+        callable: The wrapped function.
+    """
+    profiler = cProfile.Profile() if profile_dir else None
+    sampler = None
+
+    def wrapper(*args):
+        if flamegraph_dir:
+            sampler.start()
+        if profiler:
+            profiler.enable()
+        try:
+            return func(*args)
+        finally:
+            if profiler:
+                profiler.disable()
+                write_stats(profiler, os.path.join(profile_dir, name))
+            if flamegraph_dir:
+                sampler.stop()
+                sampler.write_folded(os.path.join(flamegraph_dir, f'{name}.folded'))
+
+    if flamegraph_dir:
+        sampler = StackSampler(stop_code=wrapper.__code__)
+    for directory in (profile_dir, flamegraph_dir):
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    return wrapper
+
+
+def write_stats(profiler: cProfile.Profile, base_name: str, limit: int = 30):
+    """Writes the raw profile to {base_name}.prof and the functions with the
+    highest cumulative time, with call counts, to {base_name}.txt.
+
+    Args:
+        profiler (cProfile.Profile): Profiler to write the stats of.
+        base_name (str): Path of the output files without extension.
+        limit (int): Number of functions in the text report.
+    """
+    profiler.dump_stats(f'{base_name}.prof')
+    report = io.StringIO()
+    stats = pstats.Stats(profiler, stream=report)
+    stats.sort_stats('cumulative').print_stats(limit)
+    with open(f'{base_name}.txt', 'w') as file:
+        file.write(report.getvalue())
+
+
+# Highest traced memory peak in bytes for every name given to memory_profiled
+memory_peaks = {}
+
+
+def memory_profiled(func, name: str, memory_dir: str, limit: int = 15):
+    """Wraps a function so that every call is traced with tracemalloc.
+    The peak traced memory during the call (above what was traced before it)
+    is kept in memory_peaks[name], and {name}.mem.txt in memory_dir lists the
+    peak and the source lines that allocated the most memory still held
+    when the call returned.
+
+    Args:
+        func (callable): Function to trace.
+        name (str): Key in memory_peaks and base name of the report.
+        memory_dir (str): Directory for the reports.
+        limit (int): Number of allocation sites in the report.
+
+    Returns:
+        callable: The wrapped function.
+    """
+    os.makedirs(memory_dir, exist_ok=True)
+    # Allocations made by tracemalloc and the import system are not of interest
+    filters = [tracemalloc.Filter(False, tracemalloc.__file__),
+               tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+               tracemalloc.Filter(False, '<frozen importlib._bootstrap_external>')]
+
+    def wrapper(*args):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+        before = tracemalloc.take_snapshot().filter_traces(filters)
+        traced_before = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        try:
+            return func(*args)
+        finally:
+            peak = tracemalloc.get_traced_memory()[1] - traced_before
+            after = tracemalloc.take_snapshot().filter_traces(filters)
+            memory_peaks[name] = max(memory_peaks.get(name, 0), peak)
+            with open(os.path.join(memory_dir, f'{name}.mem.txt'), 'w') as file:
+                file.write(f'Peak traced memory: {peak/1024:.1f} kB\n')
+                file.write('Top allocation sites still held after the call:\n')
+                for stat in after.compare_to(before, 'lineno')[:limit]:
+                    file.write(f'{stat}\n')
+
+    return wrapper
@@ -0,0 +1,378 @@
+import argparse
+import importlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import lru_cache, partial
+from time import perf_counter
+from aoc_common import cached_parse, file_digest, read_file, time_call
+import aoc_common
+import aoc_profile
+
+try:
+    import resource
+except ImportError:
+    # Not available on Windows, peak RSS is then left out
+    resource = None
+
+
+def _parse_day3(day, data):
+    numbers, symbols = day.get_numbers_symbols(data)
+    return day.get_adjacent(numbers, symbols), symbols
+
+
+# How to parse the input and solve each part for every day.
+# Each phase is called with the imported day module and the output of the
+# previous phase ("read" -> "parse" -> "part1"/"part2").
+# Parts that are not solved yet are set to None.
+DAY_PHASES = {
+    1: {'parse': lambda day, data: data,
+        'part1': lambda day, data: day.calibration_number(data, day.DIGIT_TRIE),
+        'part2': lambda day, data: day.calibration_number(data, day.SPELLED_TRIE)},
+    2: {'parse': lambda day, data: day.max_rgb(data),
+        'part1': lambda day, games: day.solution1(games),
+        'part2': lambda day, games: day.solution2(games)},
+    3: {'parse': _parse_day3,
+        'part1': lambda day, parsed: day.solution1(parsed[0]),
+        'part2': lambda day, parsed: day.solution2(*parsed)},
+    4: {'parse': lambda day, data: day.parse_cards(data),
+        'part1': lambda day, match_counts: day.solution1(match_counts),
+        'part2': lambda day, match_counts: day.solution2(match_counts)},
+    5: {'parse': lambda day, data: (day.get_seeds(data), day.get_maps(data)),
+        'part1': lambda day, parsed: day.solution1(day.get_locations(*parsed)),
+        'part2': lambda day, parsed: day.solution2(*parsed)},
+    6: {'parse': lambda day, data: data,
+        'part1': lambda day, data: day.solution1(data),
+        'part2': lambda day, data: day.solution2(data)},
+    7: {'parse': lambda day, data: day.parse_hands(data),
+        'part1': lambda day, hands: day.solution1(hands),
+        'part2': lambda day, hands: day.solution2(hands)},
+    8: {'parse': lambda day, data: (data[0].replace('L', '0').replace('R', '1'),
+                                    day.parse_data(data[1:])),
+        'part1': lambda day, parsed: day.solution1(*parsed),
+        'part2': lambda day, parsed: day.solution2(*parsed)},
+    9: {'parse': lambda day, data: day.parse_data(data),
+        'part1': lambda day, sequences: day.solution1(sequences),
+        'part2': lambda day, sequences: day.solution2(sequences)},
+    10: {'parse': lambda day, data: data,
+         'part1': lambda day, data: day.solution1(data),
+         'part2': None},
+}
+
+
+@lru_cache(maxsize=None)
+def phase_function(day_number: int, phase: str):
+    """Returns the function for a phase of a day, read_file for "read" and
+    otherwise from DAY_PHASES. When the environment variables AOC_PROFILE
+    and/or AOC_FLAMEGRAPH are set to a directory, the function is wrapped to
+    write cProfile stats and/or sampled stacks there, and when AOC_MEMORY is
+    set it is traced with tracemalloc, all named day{day_number}_{phase}.
+    The wrapper is reused for repeated calls so the profile covers all of them.
+
+    Args:
+        day_number (int): Day of the phase.
+        phase (str): "read", "parse", "part1" or "part2".
+
+    Returns:
+        callable: Phase function taking the day module and its input,
+        or the day number for "read".
+    """
+    func = read_file if phase == 'read' else DAY_PHASES[day_number][phase]
+    name = f'day{day_number}_{phase}'
+    profile_dir = os.environ.get('AOC_PROFILE')
+    flamegraph_dir = os.environ.get('AOC_FLAMEGRAPH')
+    memory_dir = os.environ.get('AOC_MEMORY')
+    if profile_dir or flamegraph_dir:
+        func = aoc_profile.profiled(func, name, profile_dir, flamegraph_dir)
+    if memory_dir:
+        func = aoc_profile.memory_profiled(func, name, memory_dir)
+
+    return func
+
+
+def parse_days(days: str) -> list:
+    """Converts a day selection such as "1-10" or "1,3,5-7" to a list of day numbers.
+
+    Args:
+        days (str): Comma separated day numbers or ranges of day numbers.
+
+    Returns:
+        list: Sorted list of selected day numbers.
+    """
+    selected = set()
+    for part in days.split(','):
+        if '-' in part:
+            first, last = part.split('-')
+            selected.update(range(int(first), int(last)+1))
+        else:
+            selected.add(int(part))
+
+    unknown = selected - DAY_PHASES.keys()
+    if unknown:
+        raise ValueError(f'No solution for day(s) {sorted(unknown)}')
+
+    return sorted(selected)
+
+
+def peak_rss() -> int:
+    """Returns the peak resident set size of the current process in kB,
+    or None if it can not be measured on this platform.
+    """
+    if resource is None:
+        return None
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def traced_peak(name: str) -> float:
+    """Returns the peak traced memory in kB of a phase run with AOC_MEMORY,
+    or None if the phase was not traced.
+    """
+    peak = aoc_profile.memory_peaks.get(name)
+    return peak/1024 if peak is not None else None
+
+
+def parser_version(day) -> str:
+    """Returns a version for the parser of a day that changes whenever the
+    day module, the shared helpers in aoc_common or the phase definitions
+    in this file change.
+
+    Args:
+        day (module): Imported day module.
+
+    Returns:
+        str: Combined digest of the source files.
+    """
+    return file_digest(day.__file__) + file_digest(aoc_common.__file__) + file_digest(__file__)
+
+
+def phase_row(day_number: int, phase: str, result, seconds: float) -> dict:
+    """Collects the timing of one phase together with the current peak RSS,
+    and the peak traced memory of the phase when run with AOC_MEMORY.
+
+    Args:
+        day_number (int): Day the phase belongs to.
+        phase (str): Phase name ("read", "parse", "part1" or "part2").
+        result: Answer from the phase, or None for read and parse.
+        seconds (float): Time per call.
+
+    Returns:
+        dict: Phase timing.
+    """
+    return {'day': day_number,
+            'phase': phase,
+            'seconds': seconds,
+            'calls_per_second': 1/seconds if seconds else None,
+            'result': result,
+            'peak_rss_kb': peak_rss(),
+            'peak_traced_kb': traced_peak(f'day{day_number}_{phase}')}
+
+
+def run_parse(day_number: int, repeat: int = 1, cache: bool = False) -> tuple:
+    """Reads and parses the input for a day, timing each phase.
+
+    Args:
+        day_number (int): Day to parse.
+        repeat (int): Number of calls per phase to average the time over.
+        cache (bool): Load parsed input from the on-disk cache instead of
+            reading and parsing it, timed together as the "parse" phase.
+
+    Returns:
+        tuple: Parsed input and a list of phase timings.
+    """
+    day = importlib.import_module(f'day{day_number}')
+    parse = phase_function(day_number, 'parse')
+
+    if cache:
+        parsed, parse_time = time_call(cached_parse, day_number, partial(parse, day),
+                                       parser_version(day), 'aoc_run', repeat=repeat)
+        return parsed, [phase_row(day_number, 'parse', None, parse_time)]
+
+    data, read_time = time_call(phase_function(day_number, 'read'), day_number, repeat=repeat)
+    read_row = phase_row(day_number, 'read', None, read_time)
+    parsed, parse_time = time_call(parse, day, data, repeat=repeat)
+    return parsed, [read_row, phase_row(day_number, 'parse', None, parse_time)]
+
+
+def run_part(day_number: int, part: str, parsed, repeat: int = 1) -> dict:
+    """Solves one part of a day from its parsed input and times it.
+
+    Args:
+        day_number (int): Day to solve.
+        part (str): "part1" or "part2".
+        parsed: Parsed input from run_parse.
+        repeat (int): Number of calls to average the time over.
+
+    Returns:
+        dict: Phase timing including the answer.
+    """
+    day = importlib.import_module(f'day{day_number}')
+    result, seconds = time_call(phase_function(day_number, part), day, parsed, repeat=repeat)
+    return phase_row(day_number, part, result, seconds)
+
+
+def solved_parts(day_number: int) -> list:
+    """Returns the parts ("part1", "part2") that have a solution for a day."""
+    return [part for part in ('part1', 'part2')
+            if DAY_PHASES[day_number][part] is not None]
+
+
+def run_day(day_number: int, repeat: int = 1, cache: bool = False) -> list:
+    """Reads the input for a day, then times parsing, part 1 and part 2 separately.
+
+    Args:
+        day_number (int): Day to run.
+        repeat (int): Number of calls per phase to average the time over.
+        cache (bool): Load parsed input from the on-disk cache instead of
+            reading and parsing it, timed together as the "parse" phase.
+
+    Returns:
+        list: One dict per phase with the time per call, calls per second,
+        result and the process peak RSS after the phase.
+    """
+    parsed, rows = run_parse(day_number, repeat, cache)
+    for part in solved_parts(day_number):
+        rows.append(run_part(day_number, part, parsed, repeat))
+
+    return rows
+
+
+def _parse_to_cache(day_number: int, repeat: int) -> list:
+    # Worker task: fills the on-disk cache so parts can share the parsed input
+    return run_parse(day_number, repeat, cache=True)[1]
+
+
+def _run_cached_part(day_number: int, part: str, repeat: int) -> dict:
+    # Worker task: solves a part from the cached parsed input
+    day = importlib.import_module(f'day{day_number}')
+    parsed = cached_parse(day_number, partial(DAY_PHASES[day_number]['parse'], day),
+                          parser_version(day), 'aoc_run')
+    return run_part(day_number, part, parsed, repeat)
+
+
+def run_parallel(days: list, jobs: int = None, repeat: int = 1,
+                 cache: bool = False, split: str = 'days') -> list:
+    """Runs the selected days in a process pool and gathers the phase timings
+    in the same order as run_day would give them one day at a time.
+    With split="days" each worker runs a whole day. With split="parts" each
+    day is parsed once into the on-disk cache and part 1 and 2 then run as
+    separate tasks that load the shared parsed input, so the cache is always used.
+    Peak RSS is that of the worker process that ran the phase.
+
+    Args:
+        days (list): Day numbers to run.
+        jobs (int): Number of worker processes, defaults to the number of CPUs.
+        repeat (int): Number of calls per phase to average the time over.
+        cache (bool): Use the on-disk cache of parsed inputs.
+        split (str): "days" or "parts", the unit of work given to each worker.
+
+    Returns:
+        list: Phase timings for all days.
+    """
+    rows = []
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        if split == 'days':
+            futures = [pool.submit(run_day, day_number, repeat, cache)
+                       for day_number in days]
+            for future in futures:
+                rows.extend(future.result())
+            return rows
+
+        parse_futures = {pool.submit(_parse_to_cache, day_number, repeat): day_number
+                         for day_number in days}
+        # Queue the parts of each day as soon as its input is in the cache
+        part_futures = {}
+        for future in as_completed(parse_futures):
+            day_number = parse_futures[future]
+            part_futures[day_number] = [pool.submit(_run_cached_part, day_number, part, repeat)
+                                        for part in solved_parts(day_number)]
+
+        parse_rows = {day_number: future.result()
+                      for future, day_number in parse_futures.items()}
+        for day_number in days:
+            rows.extend(parse_rows[day_number])
+            rows.extend(future.result() for future in part_futures[day_number])
+
+    return rows
+
+
+def format_table(rows: list) -> str:
+    """Formats the phase timings from run_day as a plain text table.
+
+    Args:
+        rows (list): Phase timings.
+
+    Returns:
+        str: Table with one line per phase.
+    """
+    # Peak traced memory is only shown when it was measured
+    traced = any(row['peak_traced_kb'] is not None for row in rows)
+    header = f'{"day":>4} {"phase":<6} {"time (ms)":>12} {"calls/s":>12} {"peak RSS (kB)":>14}'
+    if traced:
+        header += f' {"traced (kB)":>12}'
+    header += '  result'
+    lines = [header, '-'*len(header)]
+    for row in rows:
+        calls = f'{row["calls_per_second"]:.1f}' if row['calls_per_second'] else '-'
+        rss = row['peak_rss_kb'] if row['peak_rss_kb'] is not None else '-'
+        result = row['result'] if row['result'] is not None else ''
+        # Not measured when the phase was skipped, e.g. parsing on a cache hit
+        peak_traced = f'{row["peak_traced_kb"]:.1f}' if row['peak_traced_kb'] is not None else '-'
+        line = (f'{row["day"]:>4} {row["phase"]:<6} {row["seconds"]*1000:>12.3f} '
+                f'{calls:>12} {rss:>14}')
+        if traced:
+            line += f' {peak_traced:>12}'
+        lines.append(f'{line}  {result}')
+
+    return '\n'.join(lines)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Run and time the solutions for a selection of days.')
+    parser.add_argument('days', nargs='?', default='1-10',
+                        help='Days to run, e.g. "1-10" or "1,3,5-7" (default: all).')
+    parser.add_argument('-n', '--repeat', type=int, default=1,
+                        help='Calls per phase to average the time over.')
+    parser.add_argument('--cache', action='store_true',
+                        help='Reuse parsed inputs from the on-disk cache.')
+    parser.add_argument('-j', '--jobs', type=int, nargs='?', const=0, default=None,
+                        help='Run in a process pool with this many workers '
+                             '(all CPUs if no number is given).')
+    parser.add_argument('--split', choices=('days', 'parts'), default='days',
+                        help='Unit of work for each worker with --jobs (default: days).')
+    parser.add_argument('--profile', metavar='DIR',
+                        help='Write cProfile stats for every phase to DIR '
+                             '(same as setting AOC_PROFILE=DIR).')
+    parser.add_argument('--flamegraph', metavar='DIR',
+                        help='Write sampled stacks in collapsed flame graph format '
+                             'for every phase to DIR (same as setting AOC_FLAMEGRAPH=DIR).')
+    parser.add_argument('--memory', metavar='DIR',
+                        help='Trace memory with tracemalloc, reporting the peak per phase and '
+                             'writing the top allocation sites to DIR (same as AOC_MEMORY=DIR).')
+    parser.add_argument('--json', action='store_true',
+                        help='Print the results as JSON instead of a table.')
+    args = parser.parse_args()
+
+    # Set as environment variables so that pool workers profile as well
+    if args.profile:
+        os.environ['AOC_PROFILE'] = args.profile
+    if args.flamegraph:
+        os.environ['AOC_FLAMEGRAPH'] = args.flamegraph
+    if args.memory:
+        os.environ['AOC_MEMORY'] = args.memory
+
+    days = parse_days(args.days)
+    start = perf_counter()
+    if args.jobs is None:
+        rows = []
+        for day_number in days:
+            rows.extend(run_day(day_number, args.repeat, args.cache))
+    else:
+        rows = run_parallel(days, args.jobs or None, args.repeat, args.cache, args.split)
+    wall_time = perf_counter() - start
+
+    if args.json:
+        print(json.dumps(rows, indent=2))
+    else:
+        print(format_table(rows))
+        print(f'Total wall time: {wall_time*1000:.3f} ms')
@@ -1,64 +1,237 @@
-import regex as re
-from aoc_common import read_file
+from aoc_common import input_file_name
+import mmap
+import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
 
 
-def first_last(line, pattern):
+DIGITS = {'1': 1, '2': 2, '3': 3, '4': 4, '5': 5, '6': 6, '7': 7, '8': 8, '9': 9}
+SPELLED_DIGITS = {**DIGITS,
+                  'one': 1, 'two': 2, 'three': 3, 'four': 4,
+                  'five': 5, 'six': 6, 'seven': 7, 'eight': 8, 'nine': 9}
+# Largest byte range given to calibration_number_batch at once, which
+# allocates several temporary arrays the size of its input
+CHUNK_SIZE = 64 * 2**20
+
+
+def build_trie(digits):
+    """Builds a prefix tree of the words that identify digits, so that all
+    words starting at a position can be matched in a single walk.
+    The digit value of a word is stored under the key '' of its last node.
+
+    Args:
+        digits (dict): Words mapped to the digit value they represent.
+
+    Returns:
+        dict: Nested dicts with one level per character.
+    """
+    trie = {}
+    for word, value in digits.items():
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[''] = value
+
+    return trie
+
+
+DIGIT_TRIE = build_trie(DIGITS)
+SPELLED_TRIE = build_trie(SPELLED_DIGITS)
+
+
+def match_at(line, start, trie):
+    """Returns the value of the digit word starting at a position in line,
+    or None if no word starts there.
+
+    Args:
+        line (str): The string to search.
+        start (int): Position to match from.
+        trie (dict): Prefix tree from build_trie.
+
+    Returns:
+        int: Digit value or None.
+    """
+    node = trie
+    for i in range(start, len(line)):
+        node = node.get(line[i])
+        if node is None:
+            return None
+        if '' in node:
+            return node['']
+    return None
+
+
+def first_last(line, trie):
     """Finds the first and last occurance of digits in a string and 
     returns the number gotten from combining them (7 and 2 --> 72).
+    Searches from the left for the first digit and from the right for the
+    last, so only the ends of the line up to the digits are read.
 
     Args:
         line (str): The string to search
-        pattern (re.Pattern): Pattern to serach with
+        trie (dict): Prefix tree of the digit words from build_trie.
 
     Returns:
-        int: Output number as a combination of the first and last digits.
+        int: Output number as a combination of the first and last digits,
+        or 0 if the line has no digits (as in calibration_number_batch).
     """
-    # Must handle overlaps. 'twone' should be treated as "two, one"
-    # but results in only "two" using the standard re module.
-    matches = re.findall(pattern, line, overlapped=True)
-    digits = {'one': 1, 'two': 2, 'three': 3, 'four': 4,
-              'five': 5, 'six': 6, 'seven': 7, 'eight': 8, 'nine': 9,
-              '1': 1, '2': 2, '3': 3, '4': 4,
-              '5': 5, '6': 6, '7': 7, '8': 8, '9': 9}
-    first_num = digits[matches[0]]
-    last_num = digits[matches[-1]]
+    # Matches may overlap. 'twone' should be treated as "two, one",
+    # which holds since each end only looks for the word starting closest to it.
+    for start in range(len(line)):
+        first_num = match_at(line, start, trie)
+        if first_num is not None:
+            break
+    else:
+        return 0
+    for start in range(len(line)-1, -1, -1):
+        last_num = match_at(line, start, trie)
+        if last_num is not None:
+            break
 
     return first_num*10 + last_num
 
 
-def calibration_number(data, re_pattern):
-    """Finds the number made from the first and last digit on each line in data, as identified by the provided regex pattern.
-    Returns the sum of the numbers from all lines.
+def calibration_number(data, trie):
+    """Finds the number made from the first and last digit on each line in data, as identified by the provided prefix tree.
+    Returns the sum of the numbers from all lines. Lines without digits are skipped.
 
     Args:
-        data (list): A list of lines of text to parse.
-        re_pattern (re.Pattern): Compiled regex pattern for identifying digits.
+        data (iterable): Lines of text to parse, as a list or a stream from stream_file.
+        trie (dict): Prefix tree of the digit words from build_trie, reused for all lines.
 
     Returns:
         int: Sum of numbers from all lines.
     """
     calibration_sum = 0
     for line in data:
-        calibration_sum += first_last(line, re_pattern)
+        calibration_sum += first_last(line, trie)
 
     return calibration_sum
 
 
-if __name__ == "__main__":
-    data = read_file(1)
+def calibration_number_batch(buffer, digits):
+    """Vectorized calibration_number for a whole file at once. Marks the value
+    of every digit word at the position it starts, then takes the first and
+    last marked position on each line using the newline offsets, with no
+    Python loop over lines. Lines without digits are skipped.
+
+    Args:
+        buffer (np.ndarray): Raw bytes of the file as a uint8 array (see read_array) or bytes.
+        digits (dict): Words mapped to the digit value they represent, e.g. SPELLED_DIGITS.
+
+    Returns:
+        int: Sum of numbers from all lines.
+    """
+    if not isinstance(buffer, np.ndarray):
+        buffer = np.frombuffer(buffer, dtype=np.uint8)
+    values = np.zeros(len(buffer), dtype=np.int8)
+    for word, value in digits.items():
+        word = np.frombuffer(word.encode(), dtype=np.uint8)
+        if len(word) > len(buffer):
+            continue
+        # Compare the word one character at a time against shifted views
+        starts = len(buffer)-len(word)+1
+        match = buffer[:starts] == word[0]
+        for offset in range(1, len(word)):
+            match &= buffer[offset:offset+starts] == word[offset]
+        values[:starts][match] = value
+
+    positions = np.flatnonzero(values)
+    if len(positions) == 0:
+        return 0
+    # Line number of each digit is the number of newlines before it
+    lines = np.searchsorted(np.flatnonzero(buffer == ord('\n')), positions)
+    new_line = lines[1:] != lines[:-1]
+    first = positions[np.concatenate(([True], new_line))]
+    last = positions[np.concatenate((new_line, [True]))]
 
+    return 10*int(values[first].sum(dtype=np.int64)) + int(values[last].sum(dtype=np.int64))
+
+
+def shard_ranges(file_name, shards, max_size=CHUNK_SIZE):
+    """Splits a file into byte ranges of about equal size that start and end
+    on line boundaries. More ranges than shards are made if needed to keep
+    them at about max_size bytes (ranges are extended to the end of a line).
+
+    Args:
+        file_name (str): File to split.
+        shards (int): Number of ranges to aim for.
+        max_size (int): Largest size of a range to aim for.
+
+    Returns:
+        list: (start, stop) byte offsets of each non-empty range.
+    """
+    size = os.path.getsize(file_name)
+    if size == 0:
+        return []
+    shards = max(shards, -(-size // max_size))
+    with open(file_name, 'rb') as file:
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            bounds = [0]
+            for shard in range(1, shards):
+                # Move each split to just after the next newline
+                newline = buffer.find(b'\n', max(shard*size//shards, bounds[-1]))
+                if newline == -1:
+                    break
+                bounds.append(newline+1)
+    bounds.append(size)
+
+    return [(start, stop) for start, stop in zip(bounds, bounds[1:]) if stop > start]
+
+
+def calibrate_range(file_name, start, stop, digits):
+    """Runs calibration_number_batch on a byte range of a file, mapped with mmap.
+
+    Args:
+        file_name (str): File to read.
+        start (int): First byte of the range.
+        stop (int): Byte after the end of the range.
+        digits (dict): Words mapped to the digit value they represent.
+
+    Returns:
+        int: Sum of numbers from the lines in the range.
+    """
+    buffer = np.memmap(file_name, dtype=np.uint8, mode='r', offset=start, shape=(stop-start,))
+    return calibration_number_batch(buffer, digits)
+
+
+def calibration_number_file(file_name, digits, workers=1):
+    """Sums the calibration numbers of a file split into newline aligned byte
+    ranges of at most about CHUNK_SIZE bytes, each processed by
+    calibration_number_batch in a separate process that maps its own range,
+    so no lines are sent between processes and memory use does not grow
+    with the file size.
+
+    Args:
+        file_name (str): File to read.
+        digits (dict): Words mapped to the digit value they represent, e.g. SPELLED_DIGITS.
+        workers (int): Number of processes. With 1 the ranges are processed
+            one after another in this process.
+
+    Returns:
+        int: Sum of numbers from all lines.
+    """
+    ranges = shard_ranges(file_name, workers)
+    if workers <= 1 or len(ranges) <= 1:
+        return sum(calibrate_range(file_name, start, stop, digits) for start, stop in ranges)
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        partial_sums = [pool.submit(calibrate_range, file_name, start, stop, digits)
+                        for start, stop in ranges]
+        return sum(future.result() for future in partial_sums)
+
+
+if __name__ == "__main__":
     # Part 1
     # Find the calibration value on each line using the first and last number on the line
     # 1abc3 -> 13
     # Return the sum of all calibration values in the file
-    pattern_1 = re.compile(r'1|2|3|4|5|6|7|8|9')
-    solution_part_1 = calibration_number(data, pattern_1)
+    workers = os.cpu_count()
+    solution_part_1 = calibration_number_file(input_file_name(1), DIGITS, workers)
     print(solution_part_1)
 
     # Part 2
     # The calibration value can also be spelled out
     # 1abc3five -> 15
-    pattern_2 = re.compile(
-        r'1|2|3|4|5|6|7|8|9|one|two|three|four|five|six|seven|eight|nine')
-    solution_part_2 = calibration_number(data, pattern_2)
+    solution_part_2 = calibration_number_file(input_file_name(1), SPELLED_DIGITS, workers)
     print(solution_part_2)
@@ -1,6 +1,15 @@
 from aoc_common import read_file
 
 
+VALID_MOVES = {'|': {'N': 'N', 'S': 'S'},
+               '-': {'E': 'E', 'W': 'W'},
+               'L': {'S': 'E', 'W': 'N'},
+               'J': {'S': 'W', 'E': 'N'},
+               '7': {'N': 'W', 'E': 'S'},
+               'F': {'N': 'E', 'W': 'S'},
+               'S': {}}
+DIRECTIONS = ['N', 'W', 'S', 'E']
+
 
 def find_start(data: list):
     """Finds the position of the starting tile marked by 'S'.
@@ -17,11 +26,12 @@ def find_start(data: list):
                 return (row, col)
 
 
-def get_pipe(position: tuple):
+def get_pipe(position: tuple, data: list):
     """Returns the pipe type at the specified position.
 
     Args:
         position (tuple): Position coordinates.
+        data (list): Pipe map as a list of str.
 
     Returns:
         str: Pipe type at the new position.
@@ -29,25 +39,26 @@ def get_pipe(position: tuple):
     return data[position[0]][position[1]]
 
 
-def valid_move(new_position: tuple, direction: str):
+def valid_move(new_position: tuple, direction: str, data: list):
     """Check if a move is valid by checking if the pipe at the new position allows
     for entry from the movement direction.
 
     Args:
         new_position (tuple): Coordinates for the position you are moving to.
         direction (str): Movement direction.
+        data (list): Pipe map as a list of str.
 
     Returns:
         bool: Move is valid or not.
     """    
-    new_pipe = get_pipe(new_position)
+    new_pipe = get_pipe(new_position, data)
     if direction in VALID_MOVES[new_pipe].keys():
         return True
     else:
         return False
 
 
-def move(position: tuple, direction: str):
+def move(position: tuple, direction: str, data: list):
     """Moves 1 step along the pipe loop.
     Finds the new position and movement direction 
     based on the current position and movement direction.
@@ -55,6 +66,7 @@ def move(position: tuple, direction: str):
     Args:
         position (tuple): Coordinate position of starting tile.
         direction (str): Direction of movement.
+        data (list): Pipe map as a list of str.
 
     Returns:
         tuple: Coordinate position of the new tile.
@@ -71,8 +83,8 @@ def move(position: tuple, direction: str):
         next_pos = (position[0], position[1]+1)
 
     # Check move validity and get new direction base on pipe type
-    if valid_move(next_pos, direction):
-        dir_choices = VALID_MOVES[get_pipe(next_pos)]
+    if valid_move(next_pos, direction, data):
+        dir_choices = VALID_MOVES[get_pipe(next_pos, data)]
         next_dir = dir_choices[direction]
         return next_pos, next_dir
     else:
@@ -95,12 +107,12 @@ def solution1(data: list):
     longest_path = 0
 
     for dir in DIRECTIONS:
-        position, dir = move(start_pos, dir)
+        position, dir = move(start_pos, dir, data)
         moves = 1
 
         # Follow pipe until back at start or no valid moves (pipe blocked)
         while position and position != start_pos:
-            position, dir = move(position, dir)
+            position, dir = move(position, dir, data)
             moves += 1
         
         # Track longest path based on starting direction
@@ -112,13 +124,5 @@ def solution1(data: list):
 
 if __name__ == "__main__":
     data = read_file(10)
-    VALID_MOVES = {'|': {'N': 'N', 'S': 'S'},
-                   '-': {'E': 'E', 'W': 'W'},
-                   'L': {'S': 'E', 'W': 'N'},
-                   'J': {'S': 'W', 'E': 'N'},
-                   '7': {'N': 'W', 'E': 'S'},
-                   'F': {'N': 'E', 'W': 'S'},
-                   'S': {}}
-    DIRECTIONS = ['N', 'W', 'S', 'E']
     print(f'Solution to part 1: {solution1(data)}')
     # print(f'Solution to part 2: {solution2(data)}')
@@ -1,56 +1,57 @@
-from aoc_common import read_file
-import regex as re
+from aoc_common import extract_ints, stream_file
+import numpy as np
 
 
-def max_rgb(data_input):
+# Games x limits x colours compared at a time in feasible_id_sums
+BLOCK_CELLS = 2**22
+
+
+def max_rgb(data_input, colours=('red', 'green', 'blue'), as_array=False):
     """Extracts game id and maximum number of cubes drawn for each game, 
     considering all rounds. Works on the format 
     "Game xx: aa colour1, bb colour2; cc colour1, dd colour3", 
     where ; separates rounds within a single game.
-    Returns a list with id and the maximum number of 
-    red, green, and blue cubes drawn over all rounds in each game.
+    Each "n colour" draw is read once, in a single pass over the line.
+    Returns a list with id and the maximum number of cubes of each colour
+    (red, green, and blue by default) drawn over all rounds in each game.
 
     Args:
-        data_input (list): List of strings with game information.
+        data_input (iterable): Strings with game information, as a list or a stream from stream_file.
+        colours (tuple): Colours to find the maximum of, in output order.
+            Colours that are never drawn in a game get 0.
+        as_array (bool): Return a NumPy int64 array with one row per game
+            and the same columns instead, for the batch functions.
 
     Returns:
         list: List of lists with game id and maximum of each cube drawn over all rounds in each game.
     """
-    def max_int(text, colour):
-        """Extracts the number of cubes of a specified colour drawn in all rounds of a game and returns the maximum.
-
-        Args:
-            text (str): String to search in.
-            colour (str): Colour to search for
-
-        Returns:
-            int: Maximum number found.
-        """
-        # Finds n in all occurances of "n colour"
-        matches = re.findall(fr'\d+\s{colour}', text)
-        num = [int(match.split()[0])
-               for match in matches]
-        return max(num)
-
     rgb_by_id = []
     for line in data_input:
-        # id is the first number found
-        game_id = int(re.search(r'\d+', line).group())
-        red_max = max_int(line, 'red')
-        green_max = max_int(line, 'green')
-        blue_max = max_int(line, 'blue')
-        rgb_by_id.append([game_id, red_max, green_max, blue_max])
-
+        colon = line.index(':')
+        # id is the only number before the colon
+        game_id = extract_ints(line[:colon])[0]
+        maxima = dict.fromkeys(colours, 0)
+        # Rounds and draws within them are all handled as one list of draws
+        for draw in line[colon+1:].replace(';', ',').split(','):
+            count, colour = draw.split()
+            count = int(count)
+            if count > maxima.get(colour, count):
+                maxima[colour] = count
+        rgb_by_id.append([game_id, *maxima.values()])
+
+    if as_array:
+        return np.array(rgb_by_id, dtype=np.int64).reshape(-1, 1+len(colours))
     return rgb_by_id
 
 
-def solution1(data):
+def solution1(data, limits=(12, 13, 14)):
     """Finds the id of games where at most 12 red, 13 green, and 14 blue cubes
-    were drawn over all rounds of the game. 
+    (or the given limits) were drawn over all rounds of the game. 
     Returns the sum of the id of all such games.
 
     Args:
         data (list): List of game id and maximum of each cube for each game.
+        limits (tuple): Maximum number of cubes of each colour, in the same order as in data.
 
     Returns:
         int: Sum of winning game ids.
@@ -58,11 +59,7 @@ def solution1(data):
     sum_of_valid = 0
     for game in data:
         game_id = game[0]
-        red_max = game[1]
-        green_max = game[2]
-        blue_max = game[3]
-
-        if red_max <= 12 and green_max <= 13 and blue_max <= 14:
+        if all(cube_max <= limit for cube_max, limit in zip(game[1:], limits)):
             sum_of_valid += game_id
 
     return sum_of_valid
@@ -70,7 +67,7 @@ def solution1(data):
 
 def solution2(data):
     """Calculates the product of the maximum number of 
-    red, green, and blue cubes drawn in each game and 
+    cubes of each colour drawn in each game and 
     returns the sum of the product from all games.
 
     Args:
@@ -81,15 +78,54 @@ def solution2(data):
     """
     sum_power = 0
     for game in data:
-        red_max = game[1]
-        green_max = game[2]
-        blue_max = game[3]
-        sum_power += red_max * green_max * blue_max
+        power = 1
+        for colour_max in game[1:]:
+            power *= colour_max
+        sum_power += power
     return sum_power
 
 
+def feasible_id_sums(games, limits):
+    """Vectorized solution1 for many limits at once. For each row of limits,
+    sums the ids of the games where no colour exceeds its limit.
+    Games are compared in blocks to bound the memory used.
+
+    Args:
+        games (np.ndarray): Game table from max_rgb(..., as_array=True).
+        limits (np.ndarray): One row of limits per scenario, one column per colour.
+
+    Returns:
+        np.ndarray: Sum of feasible game ids for each scenario.
+    """
+    games = np.asarray(games, dtype=np.int64)
+    limits = np.atleast_2d(np.asarray(limits, dtype=np.int64))
+    sums = np.zeros(len(limits), dtype=np.int64)
+    block = max(1, BLOCK_CELLS // limits.size)
+    for start in range(0, len(games), block):
+        chunk = games[start:start+block]
+        # Scenarios x games
+        feasible = (chunk[np.newaxis, :, 1:] <= limits[:, np.newaxis, :]).all(axis=2)
+        sums += feasible @ chunk[:, 0]
+
+    return sums
+
+
+def power_sum(games):
+    """Vectorized solution2, the sum over all games of the product of the
+    maximum number of cubes of each colour.
+
+    Args:
+        games (np.ndarray): Game table from max_rgb(..., as_array=True).
+
+    Returns:
+        int: Sum of products of maximum cubes per game.
+    """
+    games = np.asarray(games, dtype=np.int64)
+    return int(games[:, 1:].prod(axis=1).sum())
+
+
 if __name__ == "__main__":
-    data = read_file(2)
+    data = stream_file(2)
     max_rgb_by_id = max_rgb(data)
 
     print(f'Solution to part 1: {solution1(max_rgb_by_id)}')
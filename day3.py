@@ -1,5 +1,7 @@
-from aoc_common import read_file
+from aoc_common import read_array
+from bisect import bisect_right
 import regex as re
+import numpy as np
 
 
 def get_numbers_symbols(data):
@@ -31,65 +33,66 @@ def get_numbers_symbols(data):
     return numbers, symbols
 
 
-def compare_positions(number_info, symbol_info):
-    """Finds numbers with a symbol within 1 row and 1 column of each other.
-    Returns "numfarabove" if the number row is too low (num_row < sym_row-1),
-    "numfarbelow" if the number row is too high (num_row > sym_row+1),
-    and "adjacent" if the symbol and number are adjacent on both rows and columns.
+def build_index(numbers_list):
+    """Maps every cell covered by a number to the number's position in the list,
+    so the numbers around a symbol can be looked up cell by cell.
+
+    Args:
+        numbers_list (list): List of numbers with values and positions.
+
+    Returns:
+        dict: Number index for each (row, col) covered by a number.
+    """
+    index = {}
+    for number_id, number_info in enumerate(numbers_list):
+        row = number_info[1]
+        for col in range(*number_info[2]):
+            index[(row, col)] = number_id
+
+    return index
+
+
+def adjacent_numbers(symbol_info, index):
+    """Finds the numbers within 1 row and 1 column of a symbol.
 
     Args:
-        number_info (list): List of number value, row, and columns
         symbol_info (list): List of symbol, row, and columns
+        index (dict): Number index for each cell from build_index.
 
     Returns:
-        str: String describing relative positions.
+        set: Positions in the number list of the adjacent numbers.
     """
-    num_row = number_info[1]
-    sym_row = symbol_info[1]
-    if num_row < sym_row-1:
-        return 'numfarabove'
-    if num_row > sym_row+1:
-        return 'numfarbelow'
-    # Symbol within 1 row of the number (all remaining)
-    # Symbol within 1 column of the number
-    num_col = (number_info[2][0], number_info[2][1])
-    symbol_col = symbol_info[2][0]
-    if symbol_col in range(num_col[0]-1, num_col[1]+1):
-        return 'adjacent'
+    row = symbol_info[1]
+    col = symbol_info[2][0]
+    neighbours = set()
+    for neighbour_row in (row-1, row, row+1):
+        for neighbour_col in (col-1, col, col+1):
+            number_id = index.get((neighbour_row, neighbour_col))
+            if number_id is not None:
+                neighbours.add(number_id)
+
+    return neighbours
 
 
 def get_adjacent(numbers_list, symbols_list):
     """Finds all numbers with an adjacent symbol and 
     returns a list with their values and positions.
+    Each number is included once, even if it is next to several symbols.
 
     Args:
         numbers_list (list): List of numbers with values and positions.
         symbols_list (list): List of symbols with values and positions.
 
     Returns:
-        int: Sum of all numbers with adjacent symbols.
         list: List of value and position for numbers with adjacent symbols.
     """    
-    # Make sure lists are sorted by row number for optimizations to work
-    numbers_list.sort(key=lambda x: x[1])
-    symbols_list.sort(key=lambda x: x[1])
-
-    matches = []
-    # Loop in reversed order to efficiently pop orphaned numbers
-    for symbol_info in reversed(symbols_list):
-        for number_info in reversed(numbers_list):
-            number_position = compare_positions(number_info, symbol_info)
-            if number_position == 'adjacent':
-                matches.insert(0, number_info)
-            # Reached numbers outside symbol reach (rows) - move to next symbol.
-            elif number_position == 'numfarabove':
-                break
-            # "Orphaned" number below the furthest down symbol.
-            # Discard to avoid repeatedly checking against symbols. 
-            elif number_position == 'numfarbelow':
-                numbers.pop()
-
-    return matches
+    index = build_index(numbers_list)
+    part_ids = set()
+    for symbol_info in symbols_list:
+        part_ids |= adjacent_numbers(symbol_info, index)
+
+    # Keep the order of the input list
+    return [numbers_list[number_id] for number_id in sorted(part_ids)]
 
 
 def solution1(numbers_list):
@@ -121,39 +124,279 @@ def solution2(numbers_list, symbols_list):
     Returns:
         int: Sum of gear ratios.
     """    
-    # Make sure lists are sorted by row number for optimizations to work
-    numbers_list.sort(key=lambda x: x[1])
-    symbols_list.sort(key=lambda x: x[1])
-
+    index = build_index(numbers_list)
     sum_gear_ratio = 0
-    for symbol_info in reversed(symbols_list):
+    for symbol_info in symbols_list:
         if symbol_info[0] == '*':
-            current_symbol_matches = []
-            for number_info in reversed(numbers_list):
-                position = compare_positions(number_info, symbol_info)
-                # Reached numbers outside symbol reach (rows) - move to next symbol.
-                if position == 'numfarabove':
-                    break
-                elif position == 'adjacent':
-                    current_symbol_matches.append(number_info[0])
-            
+            current_symbol_matches = adjacent_numbers(symbol_info, index)
+
             # Calculate gear ratio when multiple numbers are adjacent
             if len(current_symbol_matches) > 1:
                 gear_ratio = 1
-                for num in current_symbol_matches:
-                    gear_ratio *= num
+                for number_id in current_symbol_matches:
+                    gear_ratio *= numbers_list[number_id][0]
                 sum_gear_ratio += gear_ratio
 
     return sum_gear_ratio
 
 
-if __name__ == "__main__":
-    # Extract position of all numbers and symbols
-    data = read_file(day_number=3)
-    numbers, symbols = get_numbers_symbols(data)
+def load_grid(buffer):
+    """Reshapes the raw bytes of a schematic with equally long lines
+    to a 2D array with one row per line, without the line endings.
+
+    Args:
+        buffer (np.ndarray): Raw bytes of the file as a uint8 array (see read_array) or bytes.
+
+    Raises:
+        ValueError: If the lines are not all of the same length.
+
+    Returns:
+        np.ndarray: 2D uint8 array of characters.
+    """
+    if not isinstance(buffer, np.ndarray):
+        buffer = np.frombuffer(buffer, dtype=np.uint8)
+    # Trailing line endings and blank lines are not part of the grid
+    end = len(buffer)
+    while end > 0 and buffer[end-1] in (ord('\r'), ord('\n')):
+        end -= 1
+    if end == 0:
+        return np.zeros((0, 0), dtype=np.uint8)
+    newlines = np.flatnonzero(buffer[:end] == ord('\n'))
+    if len(newlines) == 0:
+        return buffer[:end].reshape(1, -1)
+    line_length = newlines[0] + 1
+    width = newlines[0]
+    if width > 0 and buffer[width-1] == ord('\r'):
+        width -= 1
+    rows = len(newlines) + 1
+    if (np.any(newlines != np.arange(1, rows)*line_length - 1)
+            or end - (rows-1)*line_length != width):
+        raise ValueError('All lines of the schematic must have the same length')
+    # Last line may lack its line ending
+    if len(buffer) < rows*line_length:
+        buffer = np.concatenate((buffer[:end], np.full(rows*line_length - end, ord('.'), dtype=np.uint8)))
+
+    return buffer[:rows*line_length].reshape(rows, line_length)[:, :width]
+
+
+def neighbourhood(array, fill=0):
+    """Yields the array shifted by -1, 0 and 1 rows and columns (all 9 combinations),
+    so that element (row, col) of each shift is one of the cells around (row, col).
+
+    Args:
+        array (np.ndarray): 2D array to shift.
+        fill: Value for cells shifted in from outside the array.
+
+    Yields:
+        np.ndarray: Shifted array with the same shape.
+    """
+    padded = np.pad(array, 1, constant_values=fill)
+    rows, cols = array.shape
+    for row_shift in (0, 1, 2):
+        for col_shift in (0, 1, 2):
+            yield padded[row_shift:row_shift+rows, col_shift:col_shift+cols]
+
+
+def run_values(grid, starts, lengths):
+    """Reads the numbers of digit runs in the grid, one digit position at a time.
+    Numbers too long for int64 are read as Python ints instead.
+
+    Args:
+        grid (np.ndarray): 2D uint8 array of the schematic from load_grid.
+        starts (np.ndarray): Flat index of the first digit of each run.
+        lengths (np.ndarray): Number of digits in each run.
+
+    Returns:
+        np.ndarray: Value of each run, int64 or object.
+    """
+    rows, cols = np.divmod(starts, grid.shape[1])
+    if lengths.max() > 18:
+        return np.array([int(bytes(grid[row, col:col+length]))
+                         for row, col, length in zip(rows, cols, lengths)], dtype=object)
+    values = np.zeros(len(starts), dtype=np.int64)
+    for position in range(int(lengths.max())):
+        active = lengths > position
+        values[active] = values[active]*10 + grid[rows[active], cols[active]+position] - ord('0')
+
+    return values
+
+
+def exact_sum(values):
+    """Sums an array in int64 when the sum can not overflow, otherwise in Python ints.
+
+    Args:
+        values (np.ndarray): Numbers to sum.
+
+    Returns:
+        int: Sum of the numbers.
+    """
+    if values.dtype != object and np.abs(values.astype(np.float64)).sum() >= 2**62:
+        values = values.astype(object)
+    return int(values.sum())
+
 
-    # List of numbers with an any adjacent symbol
-    parts = get_adjacent(numbers, symbols)
+def solve_grid(grid):
+    """Vectorized solution to both parts. Dilates a mask of the symbols by one
+    cell in all 8 directions, finds the digit runs on each row and reads the
+    numbers, part numbers and gears from the runs with array operations.
+    Only boolean masks the size of the grid are made, a cell is traced to
+    its number with a binary search over the flat indexes of the run starts.
+
+    Args:
+        grid (np.ndarray): 2D uint8 array of the schematic from load_grid.
+
+    Returns:
+        int: Sum of all part numbers.
+        int: Sum of gear ratios.
+    """
+    is_digit = (grid >= ord('0')) & (grid <= ord('9'))
+    is_symbol = ~is_digit & (grid != ord('.'))
+    near_symbol = np.zeros(grid.shape, dtype=bool)
+    for shifted in neighbourhood(is_symbol, fill=False):
+        near_symbol |= shifted
+    del is_symbol
+
+    # Digit runs are split at the end of each row
+    run_start = is_digit.copy()
+    run_start[:, 1:] &= ~is_digit[:, :-1]
+    starts = np.flatnonzero(run_start)
+    del run_start
+    if len(starts) == 0:
+        return 0, 0
+    run_stop = is_digit.copy()
+    run_stop[:, :-1] &= ~is_digit[:, 1:]
+    lengths = np.flatnonzero(run_stop) + 1 - starts
+    del run_stop
+    numbers = run_values(grid, starts, lengths)
+
+    # Run of a digit cell is the last run starting at or before it
+    near_digits = np.flatnonzero(is_digit & near_symbol)
+    del near_symbol
+    is_part = np.zeros(len(starts), dtype=bool)
+    is_part[np.searchsorted(starts, near_digits, side='right') - 1] = True
+    part_sum = exact_sum(numbers[is_part])
+
+    # Runs 1..n in the 9 cells around each "*", 0 for no number
+    gear_rows, gear_cols = np.nonzero(grid == ord('*'))
+    rows, cols = grid.shape
+    is_digit = is_digit.ravel()
+    around = np.zeros((len(gear_rows), 9), dtype=np.int64)
+    for i, (row_shift, col_shift) in enumerate((r, c) for r in (-1, 0, 1) for c in (-1, 0, 1)):
+        row, col = gear_rows + row_shift, gear_cols + col_shift
+        inside = (row >= 0) & (row < rows) & (col >= 0) & (col < cols)
+        cell = np.where(inside, row*cols + col, 0)
+        around[:, i] = np.where(inside & is_digit[cell],
+                                np.searchsorted(starts, cell, side='right'), 0)
+    around.sort(axis=1)
+    distinct = around != 0
+    distinct[:, 1:] &= around[:, 1:] != around[:, :-1]
+    is_gear = distinct.sum(axis=1) > 1
+    # Index 0 is "no number"
+    numbers = np.concatenate((np.ones(1, dtype=numbers.dtype), numbers))
+    gear_numbers = np.where(distinct, numbers[around], 1)[is_gear]
+    if gear_numbers.dtype != object and np.prod(gear_numbers.astype(np.float64), axis=1).sum() >= 2**62:
+        gear_numbers = gear_numbers.astype(object)
+    gear_sum = exact_sum(gear_numbers.prod(axis=1))
+
+    return part_sum, gear_sum
+
+
+def has_symbol(line, start, stop):
+    """Checks if there is a symbol (anything non-numeric except ".")
+    in line[start:stop], with start clamped to the beginning of the line.
+
+    Args:
+        line (str): Row of the schematic.
+        start (int): First column to check.
+        stop (int): Column after the last to check.
+
+    Returns:
+        bool: A symbol was found.
+    """
+    # Stripping stops at the first symbol from either end
+    return bool(line[max(start, 0):stop].strip('.0123456789'))
+
+
+def stream_parts(data):
+    """Streaming solution to both parts that only keeps three rows in memory.
+    Numbers and gears on a row are final once the row below it is read,
+    so each is yielded as soon as that happens.
+
+    Args:
+        data (iterable): Rows of the schematic, e.g. a stream from stream_file.
+
+    Yields:
+        tuple: ('part', number) for each part number and
+        ('gear', ratio) for each "*" with more than 1 adjacent number.
+    """
+    empty = ('', [], [])
+    # (row, numbers on the row as (value, start col, stop col), start cols)
+    above, middle = empty, None
+    for line in data:
+        numbers = [(int(match.group()), *match.span()) for match in re.finditer(r'\d+', line)]
+        below = (line, numbers, [start for _, start, _ in numbers])
+        if middle is not None:
+            yield from _window_parts(above, middle, below)
+            above = middle
+        middle = below
+    if middle is not None:
+        yield from _window_parts(above, middle, empty)
+
+
+def _window_parts(above, middle, below):
+    """Finds the part numbers and gears on the middle row of a three-row window.
+
+    Args:
+        above (tuple): Row above, its numbers and their start columns.
+        middle (tuple): Row to search, its numbers and their start columns.
+        below (tuple): Row below, its numbers and their start columns.
+
+    Yields:
+        tuple: ('part', number) or ('gear', ratio).
+    """
+    window = (above, middle, below)
+    for value, start, stop in middle[1]:
+        if any(has_symbol(line, start-1, stop+1) for line, _, _ in window):
+            yield 'part', value
+
+    col = middle[0].find('*')
+    while col != -1:
+        adjacent = []
+        for _, numbers, starts in window:
+            # Numbers are separated by a column, so at most the last two
+            # numbers starting before col+2 can reach the "*"
+            last = bisect_right(starts, col+1)
+            for value, start, stop in numbers[max(last-2, 0):last]:
+                if stop >= col:
+                    adjacent.append(value)
+        if len(adjacent) > 1:
+            gear_ratio = 1
+            for num in adjacent:
+                gear_ratio *= num
+            yield 'gear', gear_ratio
+        col = middle[0].find('*', col+1)
+
+
+def solve_stream(data):
+    """Sums the part numbers and gear ratios from stream_parts.
+
+    Args:
+        data (iterable): Rows of the schematic, e.g. a stream from stream_file.
+
+    Returns:
+        int: Sum of all part numbers.
+        int: Sum of gear ratios.
+    """
+    sums = {'part': 0, 'gear': 0}
+    for kind, value in stream_parts(data):
+        sums[kind] += value
+
+    return sums['part'], sums['gear']
+
+
+if __name__ == "__main__":
+    grid = load_grid(read_array(3))
+    part_sum, gear_sum = solve_grid(grid)
 
-    print(f'Solution to part 1: {solution1(parts)}')
-    print(f'Solution to part 2: {solution2(parts, symbols)}')
+    print(f'Solution to part 1: {part_sum}')
+    print(f'Solution to part 2: {gear_sum}')
@@ -1,81 +1,232 @@
-from aoc_common import read_file
-import regex as re
+from aoc_common import extract_ints, read_array
+import numpy as np
 
 
-def get_overlap(card):
-    """Finds overlap between the winning numbers and the "numbers you have", 
+# Cards compared at a time in parse_deck and count_matches_batch
+BLOCK_CARDS = 2**16
+# Bytes searched for line endings at a time in line_ends
+BLOCK_BYTES = 2**22
+
+
+def number_mask(numbers):
+    """Packs a set of numbers (at most 99) into an integer with bit n set for number n.
+
+    Args:
+        numbers (iterable): Numbers to pack.
+
+    Returns:
+        int: Bitmask of the numbers.
+    """
+    mask = 0
+    for num in numbers:
+        mask |= 1 << num
+
+    return mask
+
+
+def count_matches(card):
+    """Counts the overlap between the winning numbers and the "numbers you have", 
     separated by a vertical bar. 
-    Returns a list of all overlaps.
+    Both sides are packed into bitmasks so the overlap is the
+    number of bits set in both.
 
     Args:
         card (str): String to extract numbers from.
 
     Returns:
-        set: Set of overlapping numbers.
+        int: Number of overlapping numbers.
     """
-    numbers = re.findall(r'[|\d]+', card)
-    # Index of the vertical bar separates winning numbers and numbers you have
-    bar = numbers.index('|')
-    winning = {int(num) for num in numbers[1:bar]}
-    numbers_have = {int(num) for num in numbers[bar+1:]}
-    # Set union to find overlap
-    matches = winning & numbers_have
+    # Vertical bar separates winning numbers and numbers you have
+    winning_text, have_text = card[card.index(':')+1:].split('|')
+    winning = number_mask(extract_ints(winning_text))
+    numbers_have = number_mask(extract_ints(have_text))
+
+    return (winning & numbers_have).bit_count()
 
-    return matches
 
+def parse_cards(cards):
+    """Parses every card once to its number of matches, shared by both parts.
 
-def solution1(cards):
+    Args:
+        cards (iterable): Strings describing the cards in the deck.
+
+    Returns:
+        list: Number of matches on each card.
+    """
+    return [count_matches(card) for card in cards]
+
+
+def solution1(match_counts):
     """Scores each card based on the number of overlapping numbers (n) between
     the winning numbers and the "numbers you have" according to 2^(n-1),
     or 0 when there are no matches. 
     Returns the sum of the scores from all cards.
 
     Args:
-        cards (list): List of strings describing the cards in the deck.
+        match_counts (list): Number of matches on each card from parse_cards.
 
     Returns:
         int: Sum of score of each card.
     """
     sum_of_scores = 0
-    for card in cards:
-        overlap = get_overlap(card)
+    for overlap in match_counts:
         if overlap:
-            score = 2**(len(overlap)-1)
+            score = 2**(overlap-1)
             sum_of_scores += score
 
     return sum_of_scores
 
 
-def solution2(cards):
+def solution2(match_counts):
     """Calculates the number of overlaps (n) between winning numbers and
     'numbers you have' on the current card and adds 
     another copy of the next n cards to deck.
     Returns the total number of cards in the deck 
     when all cards have been scored.
+    Runs in linear time using a difference array of the added copies.
 
     Args:
-        cards (list): List of strings describing the cards in the deck.
+        match_counts (list): Number of matches on each card from parse_cards.
 
     Returns:
         int: The number of cards in the deck after scoring all cards.
     """
-    # Start with 1 copy of each card
-    copies_per_card = [1]*len(cards)
-
-    for i, card in enumerate(cards):
-        matches = get_overlap(card)
-        if matches:
-            score = len(matches)
-            # Increase the n=score next elements
+    # Copies won by earlier cards are added where their range starts
+    # and removed after it ends, so a running sum gives the copies of each card
+    num_cards = len(match_counts)
+    copies_change = [0]*(num_cards+1)
+    won_copies = 0
+    total_cards = 0
+
+    for i, score in enumerate(match_counts):
+        won_copies += copies_change[i]
+        # Start with 1 copy of each card
+        copies = 1 + won_copies
+        total_cards += copies
+        if score:
+            # Increase the n=score next cards
             # by the number of copies of the current card
-            copies_per_card[i+1:i+1+score] = [copy_num+copies_per_card[i]
-                                              for copy_num in copies_per_card[i+1:i+1+score]]
+            copies_change[i+1] += copies
+            copies_change[min(i+1+score, num_cards)] -= copies
+
+    return total_cards
+
+
+def line_ends(buffer):
+    """Finds the end of every line in a buffer, before its line ending,
+    searching BLOCK_BYTES at a time. Trailing blank lines are ignored.
+
+    Args:
+        buffer (np.ndarray): Raw bytes of the file as a uint8 array.
 
-    return sum(copies_per_card)
+    Returns:
+        np.ndarray: Offset just after the last character of each line.
+    """
+    end = len(buffer)
+    while end > 0 and buffer[end-1] in (ord('\r'), ord('\n')):
+        end -= 1
+    if end == 0:
+        return np.zeros(0, dtype=np.int64)
+    ends = [np.flatnonzero(buffer[start:min(start+BLOCK_BYTES, end)] == ord('\n')) + start
+            for start in range(0, end, BLOCK_BYTES)]
+    ends = np.concatenate(ends + [np.array([end])])
+    # Windows line endings
+    ends[buffer[np.maximum(ends-1, 0)] == ord('\r')] -= 1
+
+    return ends
+
+
+def parse_deck(buffer):
+    """Parses a whole deck at once into two fixed-width matrices, with one row
+    per card. The numbers are right-aligned in two columns, so every number is
+    at the same distance from the end of its line as on the first card and
+    is read from the raw bytes without splitting the lines.
+
+    Args:
+        buffer (np.ndarray): Raw bytes of the file as a uint8 array (see read_array) or bytes.
+
+    Raises:
+        ValueError: If a card does not have its numbers where the first card has them.
+
+    Returns:
+        np.ndarray: Winning numbers of each card.
+        np.ndarray: Numbers you have on each card.
+    """
+    if not isinstance(buffer, np.ndarray):
+        buffer = np.frombuffer(buffer, dtype=np.uint8)
+    ends = line_ends(buffer)
+    if len(ends) == 0:
+        empty = np.zeros((0, 0), dtype=np.uint8)
+        return empty, empty
+
+    # Positions of the ones digit of every number, counted back from the line end
+    first_line = bytes(buffer[ends[0] - min(ends[0], BLOCK_BYTES):ends[0]])
+    numbers_text = first_line[first_line.rindex(b':'):]
+    bar = len(numbers_text) - numbers_text.index(b'|')
+    digit_ends = [len(numbers_text) - i for i in range(1, len(numbers_text))
+                  if numbers_text[i:i+1].isdigit() and not numbers_text[i+1:i+2].isdigit()]
+    offsets = np.array(digit_ends, dtype=np.int64)
+    num_winning = int(np.sum(offsets > bar))
+
+    winning = np.zeros((len(ends), num_winning), dtype=np.uint8)
+    numbers_have = np.zeros((len(ends), len(offsets)-num_winning), dtype=np.uint8)
+    for start in range(0, len(ends), BLOCK_CARDS):
+        block_ends = ends[start:start+BLOCK_CARDS, np.newaxis]
+        if (np.any(buffer[block_ends - len(numbers_text)] != ord(':'))
+                or np.any(buffer[block_ends - bar] != ord('|'))):
+            raise ValueError('All cards must have their numbers in the same columns')
+        ones = buffer[block_ends - offsets] - np.uint8(ord('0'))
+        tens = buffer[block_ends - offsets - 1]
+        if np.any(ones > 9) or np.any((tens != ord(' ')) & ((tens < ord('0')) | (tens > ord('9')))):
+            raise ValueError('All cards must have their numbers in the same columns')
+        numbers = np.where(tens == ord(' '), 0, tens - np.uint8(ord('0')))*np.uint8(10) + ones
+        winning[start:start+BLOCK_CARDS] = numbers[:, :num_winning]
+        numbers_have[start:start+BLOCK_CARDS] = numbers[:, num_winning:]
+
+    return winning, numbers_have
+
+
+def count_matches_batch(winning, numbers_have):
+    """Vectorized count_matches for a whole deck. Marks the winning numbers of
+    each card in a one-hot table and looks up the numbers you have in it,
+    for a block of cards at a time.
+
+    Args:
+        winning (np.ndarray): Winning numbers of each card from parse_deck.
+        numbers_have (np.ndarray): Numbers you have on each card from parse_deck.
+
+    Returns:
+        np.ndarray: Number of matches on each card.
+    """
+    match_counts = np.zeros(len(winning), dtype=np.int64)
+    for start in range(0, len(winning), BLOCK_CARDS):
+        block_winning = winning[start:start+BLOCK_CARDS]
+        block_have = numbers_have[start:start+BLOCK_CARDS]
+        rows = np.arange(len(block_winning))[:, np.newaxis]
+        is_winning = np.zeros((len(block_winning), 100), dtype=bool)
+        is_winning[rows, block_winning] = True
+        match_counts[start:start+BLOCK_CARDS] = is_winning[rows, block_have].sum(axis=1)
+
+    return match_counts
+
+
+def solution1_batch(match_counts):
+    """Vectorized solution1 on an array of match counts.
+
+    Args:
+        match_counts (np.ndarray): Number of matches on each card.
+
+    Returns:
+        int: Sum of score of each card.
+    """
+    match_counts = np.asarray(match_counts, dtype=np.int64)
+    scores = np.where(match_counts > 0, 2**np.maximum(match_counts-1, 0), 0)
+    return int(scores.sum())
 
 
 if __name__ == "__main__":
-    data = read_file(4)
+    winning, numbers_have = parse_deck(read_array(4))
+    match_counts = count_matches_batch(winning, numbers_have)
 
-    print(f'Solution to part 1: {solution1(data)}')
-    print(f'Solution to part 2: {solution2(data)}')
+    print(f'Solution to part 1: {solution1_batch(match_counts)}')
+    print(f'Solution to part 2: {solution2(match_counts.tolist())}')
@@ -1,5 +1,8 @@
-from aoc_common import read_file
+from aoc_common import extract_ints, read_file
+from bisect import bisect_right
+from heapq import nsmallest
 import regex as re
+import numpy as np
 
 
 def get_maps(data):
@@ -20,7 +23,7 @@ def get_maps(data):
             maps[current_map] = []
         # Append map numbers to current map if line starts with numbers
         elif re.match(r'\d', line):
-            map_numbers = [int(num) for num in line.split()]
+            map_numbers = extract_ints(line)
             maps[current_map].append(map_numbers)
 
     return maps
@@ -35,7 +38,7 @@ def get_seeds(data):
     Returns:
         list: List of ids
     """    
-    seeds = [int(seed_id) for seed_id in re.findall(r'\d+', data[0])]
+    seeds = extract_ints(data[0])
     return seeds
 
 
@@ -64,48 +67,255 @@ def convert_id(id, map_subset):
 
 
 def get_all_ids(seeds, maps):
-    """Converts all provided soil ids to location ids 
-    according to the mapping patterns.
+    """Converts all provided seed ids to location ids 
+    according to the mapping patterns, in the order they are given in the almanac.
     Stores all intermediary ids during mapping and 
     returns a list with all ids for each initial seed id.
+    Meant for debugging, use get_locations to only get the location ids.
 
     Args:
         seeds (list): List of seed ids.
-        maps (dict): Dict with mapping patterns converting from soil to location.
+        maps (dict): Dict with mapping patterns converting from seed to location.
 
     Returns:
         list: List with list of all intermediary ids for each starting seed id. 
     """    
     ids = []
     for seed_id in seeds:
-        soil_id = convert_id(seed_id, maps['seed-to-soil'])
-        fertilized_id = convert_id(soil_id, maps['soil-to-fertilizer'])
-        water_id = convert_id(fertilized_id, maps['fertilizer-to-water'])
-        light_id = convert_id(water_id, maps['water-to-light'])
-        temperature_id = convert_id(light_id, maps['light-to-temperature'])
-        humidity_id = convert_id(
-            temperature_id, maps['temperature-to-humidity'])
-        location_id = convert_id(humidity_id, maps['humidity-to-location'])
-        ids.append([seed_id, soil_id, fertilized_id, water_id, light_id,
-                    temperature_id, humidity_id, location_id])
+        seed_ids = [seed_id]
+        for map_subset in maps.values():
+            seed_ids.append(convert_id(seed_ids[-1], map_subset))
+        ids.append(seed_ids)
 
     return ids
 
 
-def solution1(ids):
-    ids.sort(key=lambda x: x[-1])
-    closest_location = ids[0][-1]
+def map_pieces(map_subset):
+    """Sorts a mapping pattern into pieces covering all ids from 0.
+    Each piece starts at an id and adds an offset to all ids up to the start
+    of the next piece. Ids that are not mapped get an offset of 0.
+
+    Args:
+        map_subset (list): List of mapping parameters.
+
+    Returns:
+        tuple: Sorted list of piece starts and list of their offsets.
+    """
+    starts, offsets = [0], [0]
+    for destination_start, source_start, map_length in sorted(map_subset, key=lambda x: x[1]):
+        if source_start == starts[-1]:
+            offsets[-1] = destination_start - source_start
+        else:
+            starts.append(source_start)
+            offsets.append(destination_start - source_start)
+        # Ids after the mapped range are not mapped until the next range
+        starts.append(source_start + map_length)
+        offsets.append(0)
+
+    return starts, offsets
+
+
+def compose_maps(maps):
+    """Composes all mapping patterns, in the order they are given in the almanac,
+    into a single piecewise function from seed to location id.
+    The pieces of each map are pulled back through the function composed so far,
+    splitting its pieces where they cross the start of a piece of the map.
+
+    Args:
+        maps (dict): Dict with mapping patterns converting from seed to location.
+
+    Returns:
+        tuple: Sorted list of piece starts and list of their offsets, see location_id.
+    """
+    starts, offsets = [0], [0]
+    for map_subset in maps.values():
+        map_starts, map_offsets = map_pieces(map_subset)
+        composed_starts, composed_offsets = [], []
+        for i, (start, offset) in enumerate(zip(starts, offsets)):
+            # Range of ids the piece is mapped to so far
+            mapped_start = start + offset
+            mapped_stop = starts[i+1] + offset if i+1 < len(starts) else None
+            j = bisect_right(map_starts, mapped_start) - 1
+            composed_starts.append(start)
+            composed_offsets.append(offset + map_offsets[j])
+            for j in range(j+1, len(map_starts)):
+                if mapped_stop is not None and map_starts[j] >= mapped_stop:
+                    break
+                composed_starts.append(map_starts[j] - offset)
+                composed_offsets.append(offset + map_offsets[j])
+
+        # Merge neighbouring pieces with the same offset
+        starts, offsets = [composed_starts[0]], [composed_offsets[0]]
+        for start, offset in zip(composed_starts[1:], composed_offsets[1:]):
+            if offset != offsets[-1]:
+                starts.append(start)
+                offsets.append(offset)
+
+    return starts, offsets
+
+
+def location_id(seed_id, composed):
+    """Converts a seed id to its location id with the function from compose_maps.
+
+    Args:
+        seed_id (int): Seed id.
+        composed (tuple): Piece starts and offsets from compose_maps.
+
+    Returns:
+        int: Location id.
+    """
+    starts, offsets = composed
+    return seed_id + offsets[bisect_right(starts, seed_id) - 1]
+
+
+def get_locations(seeds, maps, history=None):
+    """Converts seed ids to location ids through the composed maps, one at a time.
+    The intermediary ids are only computed if a history list is given.
+
+    Args:
+        seeds (iterable): Seed ids.
+        maps (dict): Dict with mapping patterns converting from seed to location.
+        history (list): Optional list to append all intermediary ids
+            of each seed to, as in get_all_ids. For debugging.
+
+    Yields:
+        int: Location id of each seed id.
+    """
+    composed = compose_maps(maps)
+    for seed_id in seeds:
+        if history is not None:
+            history.extend(get_all_ids([seed_id], maps))
+        yield location_id(seed_id, composed)
+
+
+def solution1(locations, k=1):
+    """Solution to part 1. Reduces the location ids as they are produced,
+    keeping only the closest location ids seen so far.
+
+    Args:
+        locations (iterable): Location ids, e.g. from get_locations.
+        k (int): Number of closest location ids to find.
+
+    Returns:
+        int | list: The closest location id if k is 1,
+        otherwise a sorted list of the k closest location ids.
+    """
+    if k == 1:
+        return min(locations)
+
+    return nsmallest(k, locations)
 
-    return closest_location
+
+def convert_ranges(id_ranges, map_subset):
+    """Converts whole ranges of ids based on the provided mapping pattern.
+    Ranges are split where they cross the start or end of a mapped range,
+    so the work depends on the number of ranges and map entries,
+    not on the number of ids.
+
+    Args:
+        id_ranges (list): List of (start, length) ranges of ids.
+        map_subset (list): List of mapping parameters.
+
+    Returns:
+        list: List of (start, length) ranges of destination ids.
+    """
+    map_subset = sorted(map_subset, key=lambda map_numbers: map_numbers[1])
+    destination_ranges = []
+    for start, length in id_ranges:
+        # Empty ranges hold no ids
+        if length <= 0:
+            continue
+        stop = start + length
+        for destination_start, source_start, map_length in map_subset:
+            source_stop = source_start + map_length
+            if source_stop <= start:
+                continue
+            if source_start >= stop:
+                break
+            # Part before the mapped range is not mapped
+            if source_start > start:
+                destination_ranges.append((start, source_start-start))
+                start = source_start
+            mapped_stop = min(stop, source_stop)
+            if mapped_stop > start:
+                destination_ranges.append((start-source_start+destination_start, mapped_stop-start))
+            start = mapped_stop
+            if start >= stop:
+                break
+        # Part after all mapped ranges is not mapped
+        if start < stop:
+            destination_ranges.append((start, stop-start))
+
+    return destination_ranges
+
+
+def solution2(seeds, maps):
+    """Solution to part 2. The seed ids are pairs of the start and length of
+    ranges of seeds. Converts the ranges through all maps, in the order they
+    are given in the almanac, and returns the lowest location id.
+
+    Args:
+        seeds (list): List of seed ids, as (start, length) pairs.
+        maps (dict): Dict with mapping patterns converting from seed to location.
+
+    Returns:
+        int: Lowest location id of any seed.
+    """
+    id_ranges = [(start, length) for start, length in zip(seeds[::2], seeds[1::2]) if length > 0]
+    for map_subset in maps.values():
+        id_ranges = convert_ranges(id_ranges, map_subset)
+
+    return min(start for start, _ in id_ranges)
+
+
+def convert_ids(ids, map_subset):
+    """Converts an array of ids based on the provided mapping pattern.
+    The mapped range of each id is found with a binary search over the
+    sorted source starts, ids outside every mapped range are not changed.
+
+    Args:
+        ids (np.ndarray): Array of ids.
+        map_subset (list): List of mapping parameters.
+
+    Returns:
+        np.ndarray: Array of destination ids.
+    """
+    ids = np.asarray(ids, dtype=np.int64)
+    if not map_subset:
+        return ids.copy()
+    map_array = np.array(sorted(map_subset, key=lambda x: x[1]), dtype=np.int64)
+    destination_starts, source_starts, map_lengths = map_array.T
+
+    # Last mapped range starting at or before each id, if any
+    index = np.searchsorted(source_starts, ids, side='right') - 1
+    index_clipped = np.maximum(index, 0)
+    is_mapped = (index >= 0) & (ids < source_starts[index_clipped] + map_lengths[index_clipped])
+    offsets = destination_starts - source_starts
+
+    return np.where(is_mapped, ids + offsets[index_clipped], ids)
+
+
+def convert_ids_all(ids, maps):
+    """Converts an array of seed ids to location ids through all mapping patterns,
+    in the order they are given in the almanac.
+
+    Args:
+        ids (np.ndarray): Array of seed ids.
+        maps (dict): Dict with mapping patterns converting from seed to location.
+
+    Returns:
+        np.ndarray: Array of location ids.
+    """
+    for map_subset in maps.values():
+        ids = convert_ids(ids, map_subset)
+
+    return ids
 
 
 if __name__ == "__main__":
     data = read_file(5)
     all_maps = get_maps(data)
     all_seeds = get_seeds(data)
-    all_ids = get_all_ids(all_seeds, all_maps)
-
-    print(f'Solution to part 1: {solution1(all_ids)}')
 
-    # Skipping part 2 for now
-    # Brute force with all seeds takes too long
+    print(f'Solution to part 1: {solution1(get_locations(all_seeds, all_maps))}')
+    print(f'Solution to part 2: {solution2(all_seeds, all_maps)}')
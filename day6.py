@@ -1,5 +1,4 @@
-from aoc_common import read_file
-import regex as re
+from aoc_common import extract_ints, read_file
 from math import sqrt, ceil, floor
 
 
@@ -7,13 +6,10 @@ def convert_input(data):
     '''Extracts the race times and distances.
     Returns a list with (time, distance) tuples for each race.
     '''
-    times = re.findall(r'\d+', data[0])
-    distances = re.findall(r'\d+', data[1])
-    new_data = []
-    for i in range(len(times)):
-        new_data.append((int(times[i]), int(distances[i])))
+    times = extract_ints(data[0])
+    distances = extract_ints(data[1])
 
-    return new_data
+    return list(zip(times, distances))
 
 
 def solve_polynomial(time, max_distance):
@@ -49,8 +45,9 @@ def solution2(data):
     
     Returns the number of possible winning outcomes.
     '''
-    time = int(''.join(re.findall(r'\d+', data[0])))
-    max_distance = int(''.join(re.findall(r'\d+', data[1])))
+    # The spaces between the numbers are bad kerning, there is only one race
+    time = extract_ints(data[0].replace(' ', ''))[0]
+    max_distance = extract_ints(data[1].replace(' ', ''))[0]
     roots = solve_polynomial(time, max_distance)
 
     return roots[1]-roots[0]+1
@@ -1,7 +1,26 @@
-from aoc_common import read_file
+from aoc_common import stream_file
 from collections import Counter
 
 
+SORT_RULE_STANDARD = {'2': 2, '3': 3, '4': 4, '5': 5, '6': 6, '7': 7,
+                      '8': 8, '9': 9, 'T': 10, 'J': 11, 'Q': 12, 'K': 13, 'A': 14}
+SORT_RULE_JOKER = {'J': 1, '2': 2, '3': 3, '4': 4, '5': 5, '6': 6,
+                   '7': 7, '8': 8, '9': 9, 'T': 10, 'Q': 12, 'K': 13, 'A': 14}
+
+
+def parse_hands(data):
+    """Formats the puzzle input as a list of (hand, bet) tuples.
+
+    Args:
+        data (iterable): Lines of "hand bet" from the puzzle input.
+
+    Returns:
+        list: List of (str(hand), int(bet)) tuples.
+    """
+    return [(line.split()[0], int(line.split()[1]))
+            for line in data]
+
+
 def get_type(counts):
     """Determines the hand type from the card counts.
 
@@ -131,14 +150,7 @@ def solution2(data_input):
 
 
 if __name__ == "__main__":
-    SORT_RULE_STANDARD = {'2': 2, '3': 3, '4': 4, '5': 5, '6': 6, '7': 7,
-                          '8': 8, '9': 9, 'T': 10, 'J': 11, 'Q': 12, 'K': 13, 'A': 14}
-    SORT_RULE_JOKER = {'J': 1, '2': 2, '3': 3, '4': 4, '5': 5, '6': 6,
-                       '7': 7, '8': 8, '9': 9, 'T': 10, 'Q': 12, 'K': 13, 'A': 14}
-    data = read_file(7)
-    # Format data as a list of ('hand', bet) tuples
-    data = [(line.split()[0], int(line.split()[1]))
-            for line in data]
+    data = parse_hands(stream_file(7))
 
     print(f'Solution to part 1: {solution1(data)}')
     print(f'Solution to part 2: {solution2(data)}')
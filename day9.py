@@ -1,4 +1,4 @@
-from aoc_common import read_file
+from aoc_common import extract_ints, stream_file
 from time import perf_counter
 
 
@@ -12,7 +12,7 @@ def parse_data(data: list):
     Returns:
         list: Re-formatted data
     """
-    new_data = [[int(i) for i in line.split()] for line in data]
+    new_data = [extract_ints(line, signed=True) for line in data]
     return new_data
 
 
@@ -79,10 +79,11 @@ def solution2(data: list) -> int:
     sum_extrapolated = 0
     for line in data:
         new_val = line[0]
+        num_per_line = len(line)
         while len(set(line)) > 1:
             line = reduce(line)
             # Alternate between subtracting and adding the first value on each line
-            if (NUM_PER_LINE-len(line)) % 2 == 1:
+            if (num_per_line-len(line)) % 2 == 1:
                 new_val -= line[0]
             else:
                 new_val += line[0]
@@ -92,9 +93,8 @@ def solution2(data: list) -> int:
 
 
 if __name__ == "__main__":
-    data = read_file(9)
+    data = stream_file(9)
     data = parse_data(data)
-    NUM_PER_LINE = len(data[0])
 
     print(f'Solution to part 1: {solution1(data)}')
     print(f'Solution to part 1: {solution2(data)}')